@@ -134,7 +134,9 @@ async def list_models(
             try:
                 enhanced_model = volume_store.get_metric(metric_name, category)
                 if enhanced_model:
-                    models.append(enhanced_model)
+                    # Counters live in the store's cache entry, not on the cached model
+                    usage_stats = volume_store.get_usage_stats(metric_name, category)
+                    models.append(enhanced_model.model_copy(update=usage_stats))
             except Exception as e:
                 logger.warning(f"Failed to load model {metric_name}", error=str(e))
         
@@ -199,15 +201,15 @@ async def get_model(
         except Exception as parse_error:
             logger.warning(f"Failed to parse model {model_id} with SemanticModelParser", error=str(parse_error))
         
+        # Counters live in the store's cache entry, not on the cached model
+        usage_stats = volume_store.get_usage_stats(model_id, category)
+        
         return {
             "id": model_id,
             "category": category,
-            "enhanced_model": enhanced_model,
+            "enhanced_model": enhanced_model.model_copy(update=usage_stats),
             "parsed": parsed_model,
-            "cache_stats": {
-                "usage_count": enhanced_model.usage_count,
-                "last_accessed": enhanced_model.last_accessed
-            }
+            "cache_stats": usage_stats
         }
         
     except HTTPException:
@@ -130,6 +130,22 @@ class Settings(BaseSettings):
         description="Enable lineage caching to reduce repeated Unity Catalog queries"
     )
 
+    # SQL API Result Cache Settings
+    SQL_RESULT_CACHE_TTL_SECONDS: int = Field(
+        default=30,
+        description="Cache TTL in seconds for SQL API query results"
+    )
+
+    SQL_RESULT_CACHE_MAX_SIZE: int = Field(
+        default=512,
+        description="Maximum number of cached SQL API results before eviction"
+    )
+
+    SQL_RESULT_CACHE_ENABLED: bool = Field(
+        default=False,
+        description="Serve repeated SQL API queries from a short-lived result cache"
+    )
+
     @property
     def warehouse_id(self) -> Optional[str]:
         """Return explicit warehouse id or extract it from HTTP path."""
@@ -9,6 +9,7 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import structlog
 import time
 
@@ -23,6 +24,9 @@ from app.services.volume_metric_store import VolumeMetricStore
 setup_logging()
 logger = structlog.get_logger()
 
+# Longest shutdown wait for queued metric uploads, per store
+UPLOAD_FLUSH_TIMEOUT_SECONDS = 30
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -42,6 +46,13 @@ async def lifespan(app: FastAPI):
     
     # Cleanup on shutdown
     logger.info("Shutting down Enhanced Semantic Layer Service")
+    
+    # Wait for queued metric uploads to reach the volume, off the event loop
+    for store in (app.state.volume_store, models.volume_store):
+        if store:
+            failed_uploads = await asyncio.to_thread(store.flush, UPLOAD_FLUSH_TIMEOUT_SECONDS)
+            if failed_uploads:
+                logger.error("Metric uploads failed before shutdown", files=failed_uploads)
 
 
 # Create FastAPI app
@@ -77,6 +77,7 @@ class LineageCache:
         self,
         default_ttl_seconds: int = 900,
         max_size: int = 1000,
+        name: str = "lineage",
     ) -> None:
         """
         Initialize the lineage cache.
@@ -84,7 +85,10 @@ class LineageCache:
         Args:
             default_ttl_seconds: Default TTL in seconds (default: 900 = 15 minutes)
             max_size: Maximum number of cache entries (default: 1000)
+            name: Prefix of the initialization log event, for caches reused
+                outside lineage (default: "lineage")
         """
+        self.name = name
         self.default_ttl_seconds = default_ttl_seconds
         self.max_size = max_size
         self._cache: Dict[str, CacheEntry] = {}
@@ -92,7 +96,7 @@ class LineageCache:
         self._stats = CacheStatistics()
 
         logger.info(
-            "lineage_cache_initialized",
+            f"{name}_cache_initialized",
             default_ttl_seconds=default_ttl_seconds,
             max_size=max_size,
         )
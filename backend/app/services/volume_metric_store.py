@@ -5,9 +5,15 @@ Volume-based metric store using Unity Catalog Volumes for scalable YAML storage.
 import os
 import json
 import hashlib
+import heapq
+import queue
+import threading
+import time
 import yaml
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set, Tuple
 from pathlib import Path
 
 import structlog
@@ -20,6 +26,12 @@ from ..core.config import settings
 
 logger = structlog.get_logger(__name__)
 
+# Volume roots whose directory structure was already checked by this process
+_verified_volume_roots: Set[str] = set()
+
+# Concurrent downloads when loading a whole category
+_BULK_LOAD_WORKERS = 8
+
 
 class CacheConfig(BaseModel):
     """Configuration for metric caching behavior."""
@@ -46,6 +58,18 @@ class EnhancedMetricModel(SemanticModel):
     last_accessed: Optional[datetime] = None
 
 
+# Cache keys are (category, metric_id) tuples
+CacheKey = Tuple[str, str]
+
+
+@dataclass(slots=True)
+class _CacheEntry:
+    """Cached metric with hot access counters kept outside the Pydantic model."""
+    model: EnhancedMetricModel
+    last_accessed: float
+    usage_count: int
+
+
 class VolumeMetricStore:
     """
     Unity Catalog Volume-based storage for semantic models with intelligent caching.
@@ -54,15 +78,38 @@ class VolumeMetricStore:
     def __init__(self):
         self.client = WorkspaceClient()
         self.volume_base_path = "/Volumes/semantic_layer/metrics"
-        self.cache: Dict[str, EnhancedMetricModel] = {}
-        self.cache_timestamps: Dict[str, datetime] = {}
+        self.cache: Dict[CacheKey, _CacheEntry] = {}
+        self.cache_timestamps: Dict[CacheKey, datetime] = {}
+        self._timestamp_heap: List[Tuple[datetime, CacheKey]] = []
+        self._newest_timestamp: Optional[datetime] = None
+        self.cache_etags: Dict[CacheKey, str] = {}
+        self.cache_sizes: Dict[CacheKey, int] = {}
+        self._cache_size_bytes = 0
         self.cache_ttl = timedelta(minutes=30)
         
+        # Uploads run on a background thread so saves return once the cache is updated
+        self._upload_queue: "queue.Queue[Tuple[CacheKey, str, bytes, EnhancedMetricModel]]" = queue.Queue()
+        self._upload_state = threading.Condition()
+        self._pending_uploads = 0
+        # Failed uploads, recorded by the worker: cached copies still to evict,
+        # and file paths not yet reported by flush()
+        self._failed_upload_keys: Dict[CacheKey, EnhancedMetricModel] = {}
+        self._failed_upload_paths: List[str] = []
+        self._upload_worker = threading.Thread(
+            target=self._run_upload_worker,
+            name="volume-metric-uploader",
+            daemon=True
+        )
+        self._upload_worker.start()
+        
         # Initialize volume structure
         self._ensure_volume_structure()
         
     def _ensure_volume_structure(self):
         """Ensure the required volume directory structure exists."""
+        if self.volume_base_path in _verified_volume_roots:
+            return
+        
         try:
             volumes = [
                 f"{self.volume_base_path}/production_models",
@@ -71,55 +118,264 @@ class VolumeMetricStore:
                 f"{self.volume_base_path}/archives"
             ]
             
-            for volume_path in volumes:
-                try:
-                    self.client.files.get_directory_metadata(directory_path=volume_path)
-                    logger.info(f"Volume directory exists: {volume_path}")
-                except Exception:
-                    logger.info(f"Volume directory needs to be created: {volume_path}")
+            # Directories are independent, so check them concurrently
+            with ThreadPoolExecutor(max_workers=len(volumes)) as executor:
+                list(executor.map(self._check_volume_directory, volumes))
+            
+            _verified_volume_roots.add(self.volume_base_path)
                     
         except Exception as e:
             logger.warning(f"Could not verify volume structure: {e}")
     
+    def _check_volume_directory(self, volume_path: str):
+        """Check whether a single volume directory exists."""
+        try:
+            self.client.files.get_directory_metadata(directory_path=volume_path)
+            logger.info(f"Volume directory exists: {volume_path}")
+        except Exception:
+            logger.info(f"Volume directory needs to be created: {volume_path}")
+    
+    def _run_upload_worker(self):
+        """Write queued metric files to the volume, one at a time."""
+        while True:
+            cache_key, file_path, contents, metric = self._upload_queue.get()
+            failed = False
+            try:
+                self.client.files.upload(
+                    file_path=file_path,
+                    contents=contents,
+                    overwrite=True
+                )
+                logger.info(f"Uploaded {file_path} to volume")
+            except Exception as e:
+                failed = True
+                logger.error(f"Failed to upload {file_path}: {e}")
+            finally:
+                with self._upload_state:
+                    if failed:
+                        self._failed_upload_keys[cache_key] = metric
+                        self._failed_upload_paths.append(file_path)
+                    self._pending_uploads -= 1
+                    self._upload_state.notify_all()
+    
+    def _evict_failed_uploads(self) -> None:
+        """
+        Drop cached metrics whose upload failed, so reads fall back to the volume.
+        
+        Entries replaced by a later save are kept; that save has its own upload.
+        """
+        with self._upload_state:
+            failed, self._failed_upload_keys = self._failed_upload_keys, {}
+        
+        for cache_key, metric in failed.items():
+            entry = self.cache.get(cache_key)
+            if entry is not None and entry.model is metric:
+                del self.cache[cache_key]
+                self._drop_cache_timestamp(cache_key)
+                self._drop_cache_size(cache_key)
+                self.cache_etags.pop(cache_key, None)
+    
+    def flush(self, timeout: Optional[float] = None) -> List[str]:
+        """
+        Wait for queued uploads to be written to the volume.
+        
+        Args:
+            timeout: Maximum seconds to wait; None waits until the queue is empty
+            
+        Returns:
+            File paths whose upload failed since the last flush
+        """
+        with self._upload_state:
+            drained = self._upload_state.wait_for(lambda: self._pending_uploads == 0, timeout)
+            failed_paths, self._failed_upload_paths = self._failed_upload_paths, []
+        
+        if not drained:
+            logger.warning(f"Timed out waiting for {self._pending_uploads} metric uploads")
+        self._evict_failed_uploads()
+        return failed_paths
+    
     def _get_volume_path(self, category: str = "production_models") -> str:
         """Get the appropriate volume path for a category."""
         return f"{self.volume_base_path}/{category}"
     
-    def _generate_cache_key(self, metric_id: str, category: str) -> str:
+    def _generate_cache_key(self, metric_id: str, category: str) -> CacheKey:
         """Generate cache key for a metric."""
-        return f"{category}:{metric_id}"
+        return (category, metric_id)
     
-    def _is_cache_valid(self, cache_key: str) -> bool:
+    def _is_cache_valid(self, cache_key: CacheKey) -> bool:
         """Check if cached item is still valid."""
         if cache_key not in self.cache_timestamps:
             return False
         return datetime.now() - self.cache_timestamps[cache_key] < self.cache_ttl
     
-    def _load_metric_from_volume(self, metric_id: str, category: str = "production_models") -> Optional[EnhancedMetricModel]:
-        """Load a metric from Unity Catalog Volume."""
+    def _set_cache_timestamp(self, cache_key: CacheKey, timestamp: datetime) -> None:
+        """Record a cache entry's timestamp and keep oldest/newest tracking current."""
+        previous = self.cache_timestamps.get(cache_key)
+        self.cache_timestamps[cache_key] = timestamp
+        heapq.heappush(self._timestamp_heap, (timestamp, cache_key))
+        
+        newest = self._newest_timestamp
+        if newest is not None:
+            if timestamp >= newest:
+                self._newest_timestamp = timestamp
+            elif previous == newest:
+                self._newest_timestamp = None
+        elif len(self.cache_timestamps) == 1:
+            self._newest_timestamp = timestamp
+        
+        # Superseded heap entries are discarded lazily; compact if they pile up
+        if len(self._timestamp_heap) > 2 * len(self.cache_timestamps) + 64:
+            self._timestamp_heap = [(ts, key) for key, ts in self.cache_timestamps.items()]
+            heapq.heapify(self._timestamp_heap)
+    
+    def _drop_cache_timestamp(self, cache_key: CacheKey) -> None:
+        """Forget a cache entry's timestamp."""
+        timestamp = self.cache_timestamps.pop(cache_key, None)
+        if timestamp is not None and timestamp == self._newest_timestamp:
+            self._newest_timestamp = None
+    
+    def _oldest_cache_timestamp(self) -> Optional[datetime]:
+        """Get the oldest live cache timestamp, popping superseded heap entries."""
+        heap = self._timestamp_heap
+        while heap and self.cache_timestamps.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+    
+    def _newest_cache_timestamp(self) -> Optional[datetime]:
+        """Get the newest cache timestamp, rescanning only after it was dropped."""
+        if self._newest_timestamp is None and self.cache_timestamps:
+            self._newest_timestamp = max(self.cache_timestamps.values())
+        return self._newest_timestamp
+    
+    def _set_cache_size(self, cache_key: CacheKey, size_bytes: int) -> None:
+        """Record the serialized size of a cached metric."""
+        self._cache_size_bytes += size_bytes - self.cache_sizes.get(cache_key, 0)
+        self.cache_sizes[cache_key] = size_bytes
+    
+    def _drop_cache_size(self, cache_key: CacheKey) -> None:
+        """Forget the serialized size of a cached metric."""
+        self._cache_size_bytes -= self.cache_sizes.pop(cache_key, 0)
+    
+    def _get_file_path(self, metric_id: str, category: str) -> str:
+        """Get the volume file path for a metric."""
+        return f"{self._get_volume_path(category)}/{metric_id}.yml"
+    
+    def _fetch_metric_file(self, file_path: str, etag: Optional[str] = None) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Download a metric file with a conditional GET.
+        
+        The pinned SDK's files.download() does not expose response headers, so
+        the request goes through the API client and the status and ETag are
+        read from the raw response it wraps.
+        
+        Args:
+            file_path: Volume path of the file
+            etag: ETag of the cached copy, sent as If-None-Match
+            
+        Returns:
+            Tuple of (contents, ETag); contents is None if the file is unchanged
+        """
+        headers = {'Accept': 'application/octet-stream'}
+        if etag:
+            headers['If-None-Match'] = etag
+        
+        response = self.client.api_client.do(
+            'GET',
+            f"/api/2.0/fs/files{file_path}",
+            headers=headers,
+            raw=True
+        )
         try:
-            volume_path = self._get_volume_path(category)
-            file_path = f"{volume_path}/{metric_id}.yml"
+            http_response = response._response
+            if http_response.status_code == 304:
+                return None, etag
+            return response.read(), http_response.headers.get('ETag')
+        finally:
+            response.close()
+    
+    def _download_metric(
+        self,
+        metric_id: str,
+        category: str,
+        etag: Optional[str] = None
+    ) -> Tuple[bool, Optional[Tuple[EnhancedMetricModel, int, Optional[str]]]]:
+        """
+        Download and parse a metric file without touching cache state.
+        
+        Safe to run from worker threads.
+        
+        Args:
+            metric_id: Unique metric identifier
+            category: Volume category
+            etag: ETag of the cached copy; an unchanged file is not downloaded
             
-            # Download file from volume
-            response = self.client.files.download(
-                file_path=file_path,
-                # format=DownloadFormat.AUTO  # Not available in this SDK version
-            )
+        Returns:
+            Tuple of (unchanged, download result); the download result is
+            (metric, size in bytes, ETag), or None if unchanged or not found
+        """
+        try:
+            file_path = self._get_file_path(metric_id, category)
             
-            # Parse YAML content
-            yaml_content = response.contents.decode('utf-8')
-            metric_data = yaml.safe_load(yaml_content)
+            # Download file from volume, unless it still matches the cached ETag
+            contents, etag = self._fetch_metric_file(file_path, etag)
+            if contents is None:
+                return True, None
+            
+            # Parse content; files written with as_json=True skip the YAML parser
+            yaml_content = contents.decode('utf-8')
+            metric_data = None
+            if yaml_content.lstrip().startswith('{'):
+                try:
+                    metric_data = json.loads(yaml_content)
+                except ValueError:
+                    # A YAML flow mapping such as {name: foo} rather than JSON
+                    pass
+            if metric_data is None:
+                metric_data = yaml.safe_load(yaml_content)
             
             # Convert to enhanced model
             enhanced_metric = EnhancedMetricModel(**metric_data)
             
             logger.info(f"Loaded metric {metric_id} from volume {category}")
-            return enhanced_metric
+            return False, (enhanced_metric, len(contents), etag)
             
         except Exception as e:
             logger.error(f"Failed to load metric {metric_id} from volume: {e}")
+            return False, None
+    
+    def _record_file_metadata(self, cache_key: CacheKey, size_bytes: int, etag: Optional[str]) -> None:
+        """Record the size and ETag of a downloaded metric file."""
+        self._set_cache_size(cache_key, size_bytes)
+        if etag:
+            self.cache_etags[cache_key] = etag
+        else:
+            self.cache_etags.pop(cache_key, None)
+    
+    def _load_metric_from_volume(self, metric_id: str, category: str = "production_models") -> Optional[EnhancedMetricModel]:
+        """Load a metric from Unity Catalog Volume."""
+        _, downloaded = self._download_metric(metric_id, category)
+        if downloaded is None:
             return None
+        
+        metric, size_bytes, etag = downloaded
+        self._record_file_metadata(self._generate_cache_key(metric_id, category), size_bytes, etag)
+        return metric
+    
+    def _cache_metric(
+        self,
+        cache_key: CacheKey,
+        metric: EnhancedMetricModel,
+        previous: Optional[_CacheEntry]
+    ) -> _CacheEntry:
+        """Cache a freshly loaded metric, carrying usage over from any previous entry."""
+        entry = _CacheEntry(
+            model=metric,
+            last_accessed=time.time(),
+            usage_count=previous.usage_count if previous is not None else metric.usage_count
+        )
+        self.cache[cache_key] = entry
+        self._set_cache_timestamp(cache_key, datetime.now())
+        return entry
     
     def get_metric(self, metric_id: str, category: str = "production_models") -> Optional[EnhancedMetricModel]:
         """
@@ -132,60 +388,179 @@ class VolumeMetricStore:
         Returns:
             Enhanced metric model if found, None otherwise
         """
+        if self._failed_upload_keys:
+            self._evict_failed_uploads()
+        
         cache_key = self._generate_cache_key(metric_id, category)
+        entry = self.cache.get(cache_key)
         
         # Check cache first
-        if cache_key in self.cache and self._is_cache_valid(cache_key):
-            metric = self.cache[cache_key]
-            metric.last_accessed = datetime.now()
-            metric.usage_count += 1
+        if entry is not None and self._is_cache_valid(cache_key):
+            entry.last_accessed = time.time()
+            entry.usage_count += 1
             logger.debug(f"Cache hit for metric {metric_id}")
-            return metric
+            return entry.model
         
-        # Load from volume
-        metric = self._load_metric_from_volume(metric_id, category)
-        if metric:
-            # Update cache
-            self.cache[cache_key] = metric
-            self.cache_timestamps[cache_key] = datetime.now()
-            metric.last_accessed = datetime.now()
-            metric.usage_count = getattr(metric, 'usage_count', 0) + 1
+        # Expired or missing entry: conditional GET against the cached ETag
+        unchanged, downloaded = self._revalidate_or_download(metric_id, category)
+        entry = self._apply_download(cache_key, unchanged, downloaded)
+        if entry is None:
+            return None
+        
+        entry.last_accessed = time.time()
+        entry.usage_count += 1
+        if unchanged:
+            logger.debug(f"Cache revalidated for metric {metric_id} (ETag unchanged)")
+        else:
             logger.debug(f"Cache miss - loaded metric {metric_id} from volume")
+        return entry.model
+    
+    def _revalidate_or_download(
+        self,
+        metric_id: str,
+        category: str
+    ) -> Tuple[bool, Optional[Tuple[EnhancedMetricModel, int, Optional[str]]]]:
+        """
+        Fetch a metric, sending the cached ETag so an unchanged file is not downloaded.
+        
+        Reads cache state but does not modify it, so it is safe to run from worker threads.
+        
+        Returns:
+            Tuple of (unchanged, download result)
+        """
+        cache_key = self._generate_cache_key(metric_id, category)
+        etag = self.cache_etags.get(cache_key) if cache_key in self.cache else None
+        return self._download_metric(metric_id, category, etag)
+    
+    def _apply_download(
+        self,
+        cache_key: CacheKey,
+        unchanged: bool,
+        downloaded: Optional[Tuple[EnhancedMetricModel, int, Optional[str]]]
+    ) -> Optional[_CacheEntry]:
+        """Update the cache with the result of _revalidate_or_download."""
+        previous = self.cache.get(cache_key)
+        if unchanged and previous is not None:
+            self._set_cache_timestamp(cache_key, datetime.now())
+            return previous
+        if downloaded is None:
+            return None
+        
+        metric, size_bytes, etag = downloaded
+        self._record_file_metadata(cache_key, size_bytes, etag)
+        return self._cache_metric(cache_key, metric, previous)
+    
+    def _load_metrics_bulk(self, category: str) -> List[EnhancedMetricModel]:
+        """
+        Load all metrics in a category from a single directory listing.
+        
+        Valid cache entries are reused; stale or missing ones are revalidated
+        or downloaded concurrently and then cached.
+        """
+        if self._failed_upload_keys:
+            self._evict_failed_uploads()
+        
+        metric_names = self.list_metrics(category)
+        loaded: Dict[str, EnhancedMetricModel] = {}
+        stale_names = []
+        
+        for metric_name in metric_names:
+            cache_key = self._generate_cache_key(metric_name, category)
+            entry = self.cache.get(cache_key)
+            if entry is not None and self._is_cache_valid(cache_key):
+                loaded[metric_name] = entry.model
+            else:
+                stale_names.append(metric_name)
+        
+        if stale_names:
+            with ThreadPoolExecutor(max_workers=min(len(stale_names), _BULK_LOAD_WORKERS)) as executor:
+                results = list(executor.map(
+                    lambda metric_name: self._revalidate_or_download(metric_name, category),
+                    stale_names
+                ))
             
-        return metric
+            # Apply cache updates on the calling thread
+            for metric_name, (unchanged, downloaded) in zip(stale_names, results):
+                cache_key = self._generate_cache_key(metric_name, category)
+                entry = self._apply_download(cache_key, unchanged, downloaded)
+                if entry is not None:
+                    loaded[metric_name] = entry.model
+        
+        return [loaded[name] for name in metric_names if name in loaded]
     
-    def save_metric(self, metric: EnhancedMetricModel, category: str = "production_models") -> bool:
+    def get_usage_stats(self, metric_id: str, category: str = "production_models") -> Dict[str, Any]:
+        """
+        Get access statistics for a cached metric.
+        
+        Args:
+            metric_id: Unique metric identifier
+            category: Volume category
+            
+        Returns:
+            Dictionary with usage_count and last_accessed
+        """
+        entry = self.cache.get(self._generate_cache_key(metric_id, category))
+        if entry is None:
+            return {"usage_count": 0, "last_accessed": None}
+        return {
+            "usage_count": entry.usage_count,
+            "last_accessed": datetime.fromtimestamp(entry.last_accessed)
+        }
+    
+    def save_metric(
+        self,
+        metric: EnhancedMetricModel,
+        category: str = "production_models",
+        as_json: bool = False
+    ) -> bool:
         """
         Save a metric to Unity Catalog Volume.
         
+        The cache is updated immediately and the upload is queued for the
+        background worker; call flush() to wait for it to reach the volume and
+        to learn whether it failed. A failed upload also evicts the cached copy,
+        so later reads return what is actually on the volume.
+        
         Args:
             metric: Enhanced metric model to save
             category: Target volume category
+            as_json: Write the .yml file as JSON (valid YAML, but much faster
+                to serialize and parse) instead of block-style YAML
             
         Returns:
-            True if successful, False otherwise
+            True if the metric was cached and queued for upload, False otherwise
         """
         try:
             volume_path = self._get_volume_path(category)
             file_path = f"{volume_path}/{metric.name}.yml"
             
-            # Convert to YAML
-            metric_dict = metric.model_dump(exclude_unset=True)
-            yaml_content = yaml.safe_dump(metric_dict, default_flow_style=False, sort_keys=False)
+            if as_json:
+                # JSON is a subset of YAML, so any YAML reader still loads it
+                yaml_bytes = metric.model_dump_json(exclude_unset=True).encode('utf-8')
+            else:
+                # Convert to YAML
+                metric_dict = metric.model_dump(exclude_unset=True)
+                yaml_content = yaml.safe_dump(metric_dict, default_flow_style=False, sort_keys=False)
+                yaml_bytes = yaml_content.encode('utf-8')
             
-            # Upload to volume
-            self.client.files.upload(
-                file_path=file_path,
-                contents=yaml_content.encode('utf-8'),
-                overwrite=True
-            )
+            # Queue upload to volume
+            cache_key = self._generate_cache_key(metric.name, category)
+            with self._upload_state:
+                self._pending_uploads += 1
+            self._upload_queue.put((cache_key, file_path, yaml_bytes, metric))
             
             # Update cache
-            cache_key = self._generate_cache_key(metric.name, category)
-            self.cache[cache_key] = metric
-            self.cache_timestamps[cache_key] = datetime.now()
+            previous = self.cache.get(cache_key)
+            self.cache[cache_key] = _CacheEntry(
+                model=metric,
+                last_accessed=previous.last_accessed if previous else time.time(),
+                usage_count=previous.usage_count if previous else metric.usage_count
+            )
+            self._set_cache_timestamp(cache_key, datetime.now())
+            self._set_cache_size(cache_key, len(yaml_bytes))
+            self.cache_etags.pop(cache_key, None)
             
-            logger.info(f"Saved metric {metric.name} to volume {category}")
+            logger.info(f"Queued metric {metric.name} for volume {category}")
             return True
             
         except Exception as e:
@@ -237,6 +612,9 @@ class VolumeMetricStore:
             volume_path = self._get_volume_path(category)
             file_path = f"{volume_path}/{metric_id}.yml"
             
+            # A pending upload must not recreate the file after deletion
+            self.flush()
+            
             # Delete from volume
             self.client.files.delete(file_path=file_path)
             
@@ -244,8 +622,9 @@ class VolumeMetricStore:
             cache_key = self._generate_cache_key(metric_id, category)
             if cache_key in self.cache:
                 del self.cache[cache_key]
-            if cache_key in self.cache_timestamps:
-                del self.cache_timestamps[cache_key]
+            self._drop_cache_timestamp(cache_key)
+            self._drop_cache_size(cache_key)
+            self.cache_etags.pop(cache_key, None)
             
             logger.info(f"Deleted metric {metric_id} from {category}")
             return True
@@ -294,11 +673,10 @@ class VolumeMetricStore:
         all_metrics = []
         
         for category in ["production_models", "staging_models"]:
-            metric_names = self.list_metrics(category)
-            for metric_name in metric_names:
-                metric = self.get_metric(metric_name, category)
-                if metric and metric.cache_config:
-                    all_metrics.append(metric)
+            all_metrics.extend(
+                metric for metric in self._load_metrics_bulk(category)
+                if metric.cache_config
+            )
         
         return all_metrics
     
@@ -312,17 +690,17 @@ class VolumeMetricStore:
         refreshed_count = 0
         
         try:
+            # Make sure queued saves are visible on the volume first
+            self.flush()
+            
             for category in ["production_models", "staging_models"]:
                 metric_names = self.list_metrics(category)
                 
                 for metric_name in metric_names:
                     cache_key = self._generate_cache_key(metric_name, category)
                     
-                    # Force reload from volume
-                    if cache_key in self.cache:
-                        del self.cache[cache_key]
-                    if cache_key in self.cache_timestamps:
-                        del self.cache_timestamps[cache_key]
+                    # Expire the entry; unchanged files are revalidated via ETag
+                    self._drop_cache_timestamp(cache_key)
                     
                     # Reload metric
                     metric = self.get_metric(metric_name, category)
@@ -340,7 +718,7 @@ class VolumeMetricStore:
         """Get cache performance statistics."""
         return {
             "cached_metrics": len(self.cache),
-            "cache_size_mb": sum(len(str(metric).encode('utf-8')) for metric in self.cache.values()) / 1024 / 1024,
-            "oldest_cache_entry": min(self.cache_timestamps.values()) if self.cache_timestamps else None,
-            "newest_cache_entry": max(self.cache_timestamps.values()) if self.cache_timestamps else None
+            "cache_size_mb": self._cache_size_bytes / 1024 / 1024,
+            "oldest_cache_entry": self._oldest_cache_timestamp(),
+            "newest_cache_entry": self._newest_cache_timestamp()
         }
\ No newline at end of file
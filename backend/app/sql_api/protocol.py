@@ -5,6 +5,7 @@ This module handles the low-level protocol details for PostgreSQL compatibility,
 including message formats, authentication, and data type mappings.
 """
 
+import re
 import struct
 import hashlib
 from enum import IntEnum
@@ -13,6 +14,22 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Precompiled wire formats (avoids re-parsing format strings per message)
+_HDR = struct.Struct('!cI')
+_AUTH = struct.Struct('!cII')
+_AUTH_MD5 = struct.Struct('!cII4s')
+_BACKEND_KEY = struct.Struct('!cIII')
+_READY = struct.Struct('!cIc')
+_INT_BE = struct.Struct('!I')
+_SIGNED_INT_BE = struct.Struct('!i')
+_SHORT_BE = struct.Struct('!H')
+_FIELD_DESCRIPTION = struct.Struct('!IHIhiH')
+_DATA_ROW_HDR = struct.Struct('!cIH')
+_NULL_LENGTH = _SIGNED_INT_BE.pack(-1)
+
+# Null-terminated string field
+_CSTRING = re.compile(rb'([^\x00]*)\x00')
+
 
 class MessageType(IntEnum):
     """PostgreSQL message type codes."""
@@ -111,6 +128,12 @@ class PostgreSQLProtocol:
         'datetime': 1114,
     }
     
+    # Type names plus their array forms (e.g. 'text[]'), for single-lookup resolution
+    _TYPE_OID_LOOKUP = {
+        **dict.fromkeys((f'{name}[]' for name in TYPE_OIDS), TYPE_OIDS['array']),
+        **TYPE_OIDS,
+    }
+    
     # Error severity levels
     ERROR_SEVERITY = {
         'ERROR': 'ERROR',
@@ -150,26 +173,17 @@ class PostgreSQLProtocol:
         params = {}
         
         # First 4 bytes are protocol version
-        protocol_version = struct.unpack('!I', data[:4])[0]
+        protocol_version = _INT_BE.unpack_from(data)[0]
         
-        # Rest are null-terminated key-value pairs
-        pos = 4
-        while pos < len(data) - 1:  # -1 for final null terminator
-            # Find key
-            key_end = data.find(b'\x00', pos)
-            if key_end == -1:
+        # Rest are null-terminated key-value pairs, ended by an empty key
+        fields = iter(_CSTRING.findall(data, 4))
+        for key in fields:
+            if not key:
                 break
-            key = data[pos:key_end].decode('utf-8')
-            
-            # Find value
-            pos = key_end + 1
-            value_end = data.find(b'\x00', pos)
-            if value_end == -1:
+            value = next(fields, None)
+            if value is None:
                 break
-            value = data[pos:value_end].decode('utf-8')
-            
-            params[key] = value
-            pos = value_end + 1
+            params[key.decode('utf-8')] = value.decode('utf-8')
         
         logger.debug(f"Startup parameters: {params}")
         return params
@@ -181,72 +195,69 @@ class PostgreSQLProtocol:
     ) -> bytes:
         """Build authentication request message."""
         if method == AuthenticationMethod.OK:
-            return struct.pack('!cII', b'R', 8, 0)
+            return _AUTH.pack(b'R', 8, 0)
         elif method == AuthenticationMethod.CLEAR_TEXT_PASSWORD:
-            return struct.pack('!cII', b'R', 8, 3)
+            return _AUTH.pack(b'R', 8, 3)
         elif method == AuthenticationMethod.MD5_PASSWORD:
             if not salt or len(salt) != 4:
                 raise ValueError("MD5 authentication requires 4-byte salt")
-            return struct.pack('!cII4s', b'R', 12, 5, salt)
+            return _AUTH_MD5.pack(b'R', 12, 5, salt)
         else:
             raise ValueError(f"Unsupported authentication method: {method}")
     
     def build_parameter_status(self, name: str, value: str) -> bytes:
         """Build parameter status message."""
         body = name.encode('utf-8') + b'\x00' + value.encode('utf-8') + b'\x00'
-        return struct.pack('!cI', b'S', 4 + len(body)) + body
+        return _HDR.pack(b'S', 4 + len(body)) + body
     
     def build_backend_key_data(self, process_id: int, secret_key: int) -> bytes:
         """Build backend key data message."""
-        return struct.pack('!cIII', b'K', 12, process_id, secret_key)
+        return _BACKEND_KEY.pack(b'K', 12, process_id, secret_key)
     
     def build_ready_for_query(self, transaction_status: str = 'I') -> bytes:
         """Build ready for query message."""
-        return struct.pack('!cIc', b'Z', 5, transaction_status.encode('ascii'))
+        return _READY.pack(b'Z', 5, transaction_status.encode('ascii'))
     
     def build_row_description(self, columns: List[Tuple[str, str]]) -> bytes:
         """Build row description message."""
-        body = struct.pack('!H', len(columns))
+        # Reserve the 5-byte header and fill it in once the length is known
+        msg = bytearray(_HDR.size)
+        msg += _SHORT_BE.pack(len(columns))
         
         for col_name, col_type in columns:
             # Column name
-            body += col_name.encode('utf-8') + b'\x00'
-            # Table OID (0 for no specific table)
-            body += struct.pack('!I', 0)
-            # Column attribute number (0)
-            body += struct.pack('!H', 0)
-            # Data type OID
-            type_oid = self.get_type_oid(col_type)
-            body += struct.pack('!I', type_oid)
-            # Data type size (-1 for variable length)
-            body += struct.pack('!h', -1)
-            # Type modifier (-1)
-            body += struct.pack('!i', -1)
-            # Format code (0 for text)
-            body += struct.pack('!H', 0)
+            msg += col_name.encode('utf-8')
+            msg.append(0)
+            # Table OID (0), attribute number (0), data type OID,
+            # type size (-1, variable), type modifier (-1), format code (0, text)
+            msg += _FIELD_DESCRIPTION.pack(0, 0, self.get_type_oid(col_type), -1, -1, 0)
         
-        return struct.pack('!cI', b'T', 4 + len(body)) + body
+        _HDR.pack_into(msg, 0, b'T', len(msg) - 1)
+        return bytes(msg)
     
     def build_data_row(self, values: List[Any]) -> bytes:
         """Build data row message."""
-        body = struct.pack('!H', len(values))
+        # Reserve type, length and field count; packed in one call at the end
+        msg = bytearray(_DATA_ROW_HDR.size)
+        pack_length = _INT_BE.pack
         
         for value in values:
             if value is None:
                 # NULL value
-                body += struct.pack('!i', -1)
+                msg += _NULL_LENGTH
             else:
                 # Convert to string and encode
                 value_bytes = str(value).encode('utf-8')
-                body += struct.pack('!I', len(value_bytes))
-                body += value_bytes
+                msg += pack_length(len(value_bytes))
+                msg += value_bytes
         
-        return struct.pack('!cI', b'D', 4 + len(body)) + body
+        _DATA_ROW_HDR.pack_into(msg, 0, b'D', len(msg) - 1, len(values))
+        return bytes(msg)
     
     def build_command_complete(self, tag: str) -> bytes:
         """Build command complete message."""
         tag_bytes = tag.encode('utf-8') + b'\x00'
-        return struct.pack('!cI', b'C', 4 + len(tag_bytes)) + tag_bytes
+        return _HDR.pack(b'C', 4 + len(tag_bytes)) + tag_bytes
     
     def build_error_response(
         self,
@@ -269,69 +280,62 @@ class PostgreSQLProtocol:
         routine: Optional[str] = None
     ) -> bytes:
         """Build error response message."""
-        body = b''
-        
-        # Severity
-        body += b'S' + severity.encode('utf-8') + b'\x00'
-        
-        # SQLSTATE code
-        body += b'C' + code.encode('utf-8') + b'\x00'
-        
-        # Message
-        body += b'M' + message.encode('utf-8') + b'\x00'
+        # Severity, SQLSTATE code and message
+        parts = [
+            b'S', severity.encode('utf-8'), b'\x00',
+            b'C', code.encode('utf-8'), b'\x00',
+            b'M', message.encode('utf-8'), b'\x00',
+        ]
         
         # Optional fields
         if detail:
-            body += b'D' + detail.encode('utf-8') + b'\x00'
+            parts.extend((b'D', detail.encode('utf-8'), b'\x00'))
         if hint:
-            body += b'H' + hint.encode('utf-8') + b'\x00'
+            parts.extend((b'H', hint.encode('utf-8'), b'\x00'))
         if position is not None:
-            body += b'P' + str(position).encode('utf-8') + b'\x00'
+            parts.extend((b'P', str(position).encode('utf-8'), b'\x00'))
         if where:
-            body += b'W' + where.encode('utf-8') + b'\x00'
+            parts.extend((b'W', where.encode('utf-8'), b'\x00'))
         if schema:
-            body += b's' + schema.encode('utf-8') + b'\x00'
+            parts.extend((b's', schema.encode('utf-8'), b'\x00'))
         if table:
-            body += b't' + table.encode('utf-8') + b'\x00'
+            parts.extend((b't', table.encode('utf-8'), b'\x00'))
         if column:
-            body += b'c' + column.encode('utf-8') + b'\x00'
+            parts.extend((b'c', column.encode('utf-8'), b'\x00'))
         
         # Terminator
-        body += b'\x00'
+        parts.append(b'\x00')
         
-        return struct.pack('!cI', b'E', 4 + len(body)) + body
+        body = b''.join(parts)
+        return _HDR.pack(b'E', 4 + len(body)) + body
     
     def build_empty_query_response(self) -> bytes:
         """Build empty query response message."""
-        return struct.pack('!cI', b'I', 4)
+        return _HDR.pack(b'I', 4)
     
     def build_parse_complete(self) -> bytes:
         """Build parse complete message."""
-        return struct.pack('!cI', b'1', 4)
+        return _HDR.pack(b'1', 4)
     
     def build_bind_complete(self) -> bytes:
         """Build bind complete message."""
-        return struct.pack('!cI', b'2', 4)
+        return _HDR.pack(b'2', 4)
     
     def build_no_data(self) -> bytes:
         """Build no data message."""
-        return struct.pack('!cI', b'n', 4)
+        return _HDR.pack(b'n', 4)
     
     def get_type_oid(self, type_name: str) -> int:
         """Get PostgreSQL type OID for a given type name."""
-        # Normalize type name
-        type_name = type_name.lower().strip()
-        
-        # Check direct mapping
-        if type_name in self.TYPE_OIDS:
-            return self.TYPE_OIDS[type_name]
+        # Fast path: already-normalized names need no string allocation
+        type_oid = self._TYPE_OID_LOOKUP.get(type_name)
+        if type_oid is not None:
+            return type_oid
         
-        # Check for array types
-        if type_name.endswith('[]'):
-            base_type = type_name[:-2]
-            if base_type in self.TYPE_OIDS:
-                # Return generic array OID
-                return self.TYPE_OIDS['array']
+        # Normalize type name; covers direct mappings and array types
+        type_oid = self._TYPE_OID_LOOKUP.get(type_name.lower().strip())
+        if type_oid is not None:
+            return type_oid
         
         # Default to text type
         return self.TYPE_OIDS['text']
@@ -345,28 +349,24 @@ class PostgreSQLProtocol:
     
     def parse_parse_message(self, data: bytes) -> Tuple[str, str, List[int]]:
         """Parse Parse message (prepared statement)."""
-        pos = 0
+        view = memoryview(data)
         
         # Statement name (null-terminated)
-        name_end = data.find(b'\x00', pos)
-        stmt_name = data[pos:name_end].decode('utf-8')
+        name_end = data.find(b'\x00')
+        stmt_name = str(view[:name_end], 'utf-8')
         pos = name_end + 1
         
         # Query string (null-terminated)
         query_end = data.find(b'\x00', pos)
-        query = data[pos:query_end].decode('utf-8')
+        query = str(view[pos:query_end], 'utf-8')
         pos = query_end + 1
         
         # Number of parameter types
-        param_count = struct.unpack('!H', data[pos:pos+2])[0]
+        param_count = _SHORT_BE.unpack_from(data, pos)[0]
         pos += 2
         
         # Parameter type OIDs
-        param_types = []
-        for _ in range(param_count):
-            type_oid = struct.unpack('!I', data[pos:pos+4])[0]
-            param_types.append(type_oid)
-            pos += 4
+        param_types = list(struct.unpack_from(f'!{param_count}I', data, pos))
         
         return stmt_name, query, param_types
     
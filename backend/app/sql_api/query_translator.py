@@ -6,11 +6,13 @@ handling the mapping between SQL syntax and semantic model concepts.
 """
 
 import re
+import json
 import sqlparse
 from sqlparse.sql import IdentifierList, Identifier, Where, Comparison, Function
 from sqlparse.tokens import Keyword, DML, Punctuation, Whitespace, Literal, Name
-from typing import Dict, List, Any, Optional, Tuple, Set
+from typing import Callable, Dict, List, Any, Optional, Tuple, Set
 from dataclasses import dataclass, field
+from functools import lru_cache
 
 import structlog
 
@@ -18,8 +20,45 @@ from .virtual_schema import VirtualSchemaManager, VirtualTable
 
 logger = structlog.get_logger()
 
+# Number of distinct (SQL, schema version) translations kept per translator
+TRANSLATION_CACHE_SIZE = 1024
 
-@dataclass
+# SQL keywords that can never be table names
+_SQL_KEYWORDS = frozenset({
+    'SELECT', 'FROM', 'WHERE', 'GROUP', 'BY', 'ORDER',
+    'HAVING', 'LIMIT', 'OFFSET', 'JOIN', 'LEFT', 'RIGHT',
+    'INNER', 'OUTER', 'ON', 'AND', 'OR', 'NOT', 'IN',
+    'EXISTS', 'BETWEEN', 'LIKE', 'AS', 'ASC', 'DESC'
+})
+
+# Semantic column types that can be filtered on
+_FILTERABLE_TYPES = frozenset({'dimension', 'entity'})
+
+# WHERE operator -> builder of the semantic filter value
+_FILTER_BUILDERS: Dict[str, Callable[[Any], Any]] = {
+    '=': lambda value: value,
+    'IN': lambda value: {'in': value},
+    'BETWEEN': lambda value: {'between': value},
+    'LIKE': lambda value: {'like': value},
+    **{
+        op: (lambda value, op=op: {op: value})
+        for op in ('>', '>=', '<', '<=', '!=', '<>')
+    },
+}
+
+
+@lru_cache(maxsize=2048)
+def _parse_statement(sql: str):
+    """Parse the first statement of a SQL string.
+    
+    Parsing is the most expensive step of a translation and does not depend
+    on the schema, so statements survive schema reloads. The translator
+    only reads the returned token tree, which makes sharing it safe.
+    """
+    return sqlparse.parse(sql)[0]
+
+
+@dataclass(slots=True)
 class SemanticQuery:
     """Represents a translated semantic query."""
     model: str
@@ -52,15 +91,30 @@ class SemanticQuery:
         return result
 
 
+@dataclass(slots=True)
+class _Parts:
+    """Raw clauses of a SELECT statement, collected in one pass over its tokens."""
+    tables: List[str] = field(default_factory=list)
+    select_list: List[Any] = field(default_factory=list)
+    where: Optional[Where] = None
+    group_by: List[str] = field(default_factory=list)
+    order_by: List[Tuple[str, str]] = field(default_factory=list)
+    limit: Optional[int] = None
+
+
+# Clause states for _scan_statement
+_PENDING, _ACTIVE, _DONE = range(3)
+
+
 class SQLToSemanticTranslator:
     """Translates SQL queries to semantic queries."""
     
     # Common aggregate functions
-    AGGREGATE_FUNCTIONS = {
+    AGGREGATE_FUNCTIONS = frozenset({
         'sum', 'avg', 'count', 'min', 'max',
         'stddev', 'stddev_pop', 'stddev_samp',
         'var_pop', 'var_samp', 'variance'
-    }
+    })
     
     # Time granularity mappings
     TIME_GRANULARITIES = {
@@ -76,35 +130,58 @@ class SQLToSemanticTranslator:
     def __init__(self, schema_manager: Optional[VirtualSchemaManager] = None):
         """Initialize translator."""
         self.schema_manager = schema_manager or VirtualSchemaManager()
+        # Dashboards re-issue the same SQL constantly; the schema version is
+        # part of the key so a model reload invalidates old translations
+        self._translate_cached = lru_cache(maxsize=TRANSLATION_CACHE_SIZE)(self._translate_sql)
+        # SELECT item type -> handler; anything else may be a bare '*'
+        self._select_item_handlers = {
+            Function: self._process_select_function,
+            Identifier: self._process_select_column,
+        }
     
-    async def translate(self, sql: str) -> Dict[str, Any]:
+    def translate(self, sql: str) -> Dict[str, Any]:
         """Translate SQL query to semantic query."""
+        # Decoding the cached JSON gives each caller its own copy
+        return json.loads(self.translate_bytes(sql))
+    
+    def translate_bytes(self, sql: str) -> bytes:
+        """Translate SQL query to a JSON-encoded semantic query.
+        
+        Cached translations are stored encoded, so handlers that send the
+        semantic query on as JSON can skip building and encoding a dict.
+        """
+        # Clients differ in trailing whitespace and terminators; neither
+        # changes the translation, so share one cache entry
+        key = sql.strip().rstrip(';').rstrip() or sql
         try:
-            # Parse SQL
-            parsed = sqlparse.parse(sql)[0]
-            
-            # Determine query type
-            if parsed.get_type() == 'SELECT':
-                return await self._translate_select(parsed)
-            else:
-                raise ValueError(f"Unsupported SQL statement type: {parsed.get_type()}")
-                
+            return self._translate_cached(key, self.schema_manager.version)
         except Exception as e:
             logger.error(f"SQL translation failed: {e}", sql=sql)
             raise
     
-    async def _translate_select(self, statement) -> Dict[str, Any]:
+    def _translate_sql(self, sql: str, schema_version: int) -> bytes:
+        """Parse, translate and encode SQL; memoized per schema version."""
+        # Parse SQL
+        parsed = _parse_statement(sql)
+        
+        # Determine query type
+        if parsed.get_type() == 'SELECT':
+            return json.dumps(self._translate_select(parsed), separators=(',', ':')).encode('utf-8')
+        else:
+            raise ValueError(f"Unsupported SQL statement type: {parsed.get_type()}")
+    
+    def _translate_select(self, statement) -> Dict[str, Any]:
         """Translate SELECT statement."""
         query = SemanticQuery(model='')
         
         # Extract components
-        tables = self._extract_tables(statement)
-        if not tables:
+        parts = self._scan_statement(statement)
+        if not parts.tables:
             raise ValueError("No table found in FROM clause")
         
         # Get main table and semantic model
-        main_table_ref = tables[0]
-        table = self.schema_manager.get_table(main_table_ref)
+        main_table_ref = parts.tables[0]
+        table = self.schema_manager.resolve(main_table_ref)
         if not table:
             raise ValueError(f"Table not found: {main_table_ref}")
         
@@ -112,141 +189,182 @@ class SQLToSemanticTranslator:
         model_name = table.semantic_model.get('name', '')
         query.model = model_name
         
-        # Extract SELECT columns
-        select_list = self._extract_select_list(statement)
-        self._process_select_list(select_list, table, query)
+        # SELECT columns
+        self._process_select_list(parts.select_list, table, query)
         
-        # Extract WHERE clause
-        where_clause = self._extract_where(statement)
-        if where_clause:
-            self._process_where_clause(where_clause, table, query)
+        # WHERE clause
+        if parts.where:
+            self._process_where_clause(parts.where, table, query)
         
-        # Extract GROUP BY
-        group_by = self._extract_group_by(statement)
-        if group_by:
-            self._process_group_by(group_by, table, query)
+        # GROUP BY
+        if parts.group_by:
+            self._process_group_by(parts.group_by, table, query)
         
-        # Extract ORDER BY
-        order_by = self._extract_order_by(statement)
-        if order_by:
-            self._process_order_by(order_by, query)
+        # ORDER BY
+        if parts.order_by:
+            self._process_order_by(parts.order_by, query)
         
-        # Extract LIMIT
-        limit = self._extract_limit(statement)
-        if limit:
-            query.limit = limit
+        # LIMIT
+        if parts.limit:
+            query.limit = parts.limit
         
         # Detect time granularity
         query.time_granularity = self._detect_time_granularity(query, table)
         
         return query.to_dict()
     
-    def _extract_tables(self, statement) -> List[str]:
-        """Extract table references from FROM clause."""
-        tables = []
+    def _scan_statement(self, statement) -> _Parts:
+        """Collect the clauses of a SELECT statement in a single pass.
+        
+        Each clause is tracked independently, exactly as if the top-level
+        tokens were walked once per clause.
+        """
+        parts = _Parts()
         from_seen = False
+        select_state = group_state = order_state = limit_state = _PENDING
         
         for token in statement.tokens:
+            ttype = token.ttype
+            is_keyword = ttype is Keyword
+            keyword = token.value.upper() if is_keyword or ttype is DML else None
+            is_whitespace = token.is_whitespace
+            
+            # FROM: every table-like token after it is a table reference
             if from_seen:
                 if isinstance(token, IdentifierList):
                     for identifier in token.get_identifiers():
-                        tables.append(str(identifier).strip())
+                        parts.tables.append(str(identifier).strip())
                 elif isinstance(token, Identifier):
-                    tables.append(str(token).strip())
-                elif token.ttype is None and not token.is_whitespace:
+                    parts.tables.append(str(token).strip())
+                elif ttype is None and not is_whitespace:
                     # Simple table name
                     table_name = str(token).strip()
                     if table_name and not self._is_keyword(table_name):
-                        tables.append(table_name)
-            elif token.ttype is Keyword and token.value.upper() == 'FROM':
+                        parts.tables.append(table_name)
+            elif is_keyword and keyword == 'FROM':
                 from_seen = True
-            elif from_seen and token.ttype is Keyword:
-                # Stop at next keyword (WHERE, GROUP BY, etc.)
-                break
-        
-        return tables
-    
-    def _extract_select_list(self, statement) -> List[Any]:
-        """Extract SELECT list items."""
-        select_list = []
-        select_seen = False
-        
-        for token in statement.tokens:
-            if select_seen and token.ttype is Keyword:
-                break
-            elif token.ttype is DML and token.value.upper() == 'SELECT':
-                select_seen = True
-            elif select_seen:
+            
+            # SELECT list: runs up to the next keyword
+            if select_state == _ACTIVE and is_keyword:
+                select_state = _DONE
+            elif select_state != _DONE and ttype is DML and keyword == 'SELECT':
+                select_state = _ACTIVE
+            elif select_state == _ACTIVE:
                 if isinstance(token, IdentifierList):
-                    select_list.extend(token.get_identifiers())
+                    parts.select_list.extend(token.get_identifiers())
                 elif isinstance(token, (Identifier, Function)) or \
-                     (token.ttype is None and not token.is_whitespace):
-                    select_list.append(token)
-        
-        return select_list
+                     (ttype is None and not is_whitespace):
+                    parts.select_list.append(token)
+            
+            # WHERE is grouped by sqlparse
+            if parts.where is None and isinstance(token, Where):
+                parts.where = token
+            
+            # GROUP BY: runs up to the next keyword
+            if group_state == _ACTIVE and is_keyword:
+                group_state = _DONE
+            elif group_state == _PENDING and is_keyword and 'GROUP' in keyword:
+                group_state = _ACTIVE
+            elif group_state == _ACTIVE and not is_whitespace:
+                if isinstance(token, IdentifierList):
+                    for identifier in token.get_identifiers():
+                        parts.group_by.append(self._extract_column_name(identifier))
+                elif ttype is None:
+                    col_name = str(token).strip()
+                    if col_name and col_name != 'BY':
+                        parts.group_by.append(col_name)
+            
+            # ORDER BY: runs up to the next keyword other than ASC/DESC
+            if order_state == _ACTIVE and is_keyword and keyword not in ('ASC', 'DESC'):
+                order_state = _DONE
+            elif order_state == _PENDING and is_keyword and 'ORDER' in keyword:
+                order_state = _ACTIVE
+            elif order_state == _ACTIVE and not is_whitespace:
+                if isinstance(token, IdentifierList):
+                    for identifier in token.get_identifiers():
+                        col_name = self._extract_column_name(identifier)
+                        # Check for ASC/DESC after column
+                        direction = 'asc'  # default
+                        parts.order_by.append((col_name, direction))
+                elif ttype is None:
+                    col_name = str(token).strip()
+                    if col_name and col_name != 'BY':
+                        direction = 'asc'
+                        parts.order_by.append((col_name, direction))
+            
+            # LIMIT: the first number after the keyword
+            if limit_state == _ACTIVE and ttype in Literal.Number:
+                parts.limit = int(token.value)
+                limit_state = _DONE
+            elif limit_state == _PENDING and is_keyword and keyword == 'LIMIT':
+                limit_state = _ACTIVE
+        
+        return parts
     
     def _process_select_list(self, select_list: List[Any], table: VirtualTable, query: SemanticQuery):
         """Process SELECT list items into metrics/dimensions."""
+        handlers = self._select_item_handlers
         for item in select_list:
-            if isinstance(item, Function):
-                # Aggregate function - likely a measure
-                func_name = self._get_function_name(item).lower()
-                args = self._get_function_args(item)
-                
-                if func_name in self.AGGREGATE_FUNCTIONS:
-                    # Check if this matches a predefined measure
-                    measure_name = self._find_matching_measure(func_name, args, table)
-                    if measure_name:
-                        # It's a predefined measure - check if there's a metric
-                        metric_name = self._find_metric_for_measure(measure_name, table)
-                        if metric_name:
-                            query.metrics.append(metric_name)
-                        else:
-                            query.measures.append({
-                                'name': measure_name,
-                                'agg': func_name,
-                                'expr': args[0] if args else '*'
-                            })
-                    else:
-                        # Ad-hoc measure
-                        query.measures.append({
-                            'name': f"{func_name}_{args[0] if args else 'all'}",
-                            'agg': func_name,
-                            'expr': args[0] if args else '*'
-                        })
-                        
-            elif str(item).strip() == '*':
-                # SELECT * - add all dimensions
-                for col in table.columns:
-                    if col.semantic_type == 'dimension':
-                        query.dimensions.append(col.name)
-                    elif col.semantic_type == 'metric':
-                        query.metrics.append(col.name)
-                        
+            handlers.get(type(item), self._process_select_token)(item, table, query)
+    
+    def _process_select_function(self, item: Function, table: VirtualTable, query: SemanticQuery):
+        """Process a function call in the SELECT list."""
+        # Aggregate function - likely a measure
+        func_name = self._get_function_name(item).lower()
+        args = self._get_function_args(item)
+        
+        if func_name in self.AGGREGATE_FUNCTIONS:
+            # Check if this matches a predefined measure
+            measure_name = self._find_matching_measure(func_name, args, table)
+            if measure_name:
+                # It's a predefined measure - check if there's a metric
+                metric_name = self._find_metric_for_measure(measure_name, table)
+                if metric_name:
+                    query.metrics.append(metric_name)
+                else:
+                    query.measures.append({
+                        'name': measure_name,
+                        'agg': func_name,
+                        'expr': args[0] if args else '*'
+                    })
             else:
-                # Regular column - check type
-                col_name = self._extract_column_name(item)
-                col = table.get_column(col_name)
-                
-                if col:
-                    if col.semantic_type == 'dimension':
-                        query.dimensions.append(col_name)
-                    elif col.semantic_type == 'metric':
-                        query.metrics.append(col_name)
-                    elif col.semantic_type == 'measure':
-                        # Raw measure without aggregation
-                        query.measures.append({
-                            'name': col_name,
-                            'agg': 'sum',  # Default aggregation
-                            'expr': col_name
-                        })
+                # Ad-hoc measure
+                query.measures.append({
+                    'name': f"{func_name}_{args[0] if args else 'all'}",
+                    'agg': func_name,
+                    'expr': args[0] if args else '*'
+                })
     
-    def _extract_where(self, statement) -> Optional[Where]:
-        """Extract WHERE clause."""
-        for token in statement.tokens:
-            if isinstance(token, Where):
-                return token
-        return None
+    def _process_select_token(self, item, table: VirtualTable, query: SemanticQuery):
+        """Process a SELECT list item that is neither a function nor an identifier."""
+        if str(item).strip() == '*':
+            # SELECT * - add all dimensions
+            for col in table.columns:
+                if col.semantic_type == 'dimension':
+                    query.dimensions.append(col.name)
+                elif col.semantic_type == 'metric':
+                    query.metrics.append(col.name)
+        else:
+            self._process_select_column(item, table, query)
+    
+    def _process_select_column(self, item, table: VirtualTable, query: SemanticQuery):
+        """Process a column reference in the SELECT list."""
+        # Regular column - check type
+        col_name = self._extract_column_name(item)
+        col = table.get_column(col_name)
+        
+        if col:
+            if col.semantic_type == 'dimension':
+                query.dimensions.append(col_name)
+            elif col.semantic_type == 'metric':
+                query.metrics.append(col_name)
+            elif col.semantic_type == 'measure':
+                # Raw measure without aggregation
+                query.measures.append({
+                    'name': col_name,
+                    'agg': 'sum',  # Default aggregation
+                    'expr': col_name
+                })
     
     def _process_where_clause(self, where: Where, table: VirtualTable, query: SemanticQuery):
         """Process WHERE clause into filters."""
@@ -254,18 +372,12 @@ class SQLToSemanticTranslator:
         conditions = self._extract_conditions(where)
         
         for column, operator, value in conditions:
+            build_filter = _FILTER_BUILDERS.get(operator)
+            if build_filter is None:
+                continue
             col = table.get_column(column)
-            if col and col.semantic_type in ['dimension', 'entity']:
-                if operator == '=':
-                    query.filters[column] = value
-                elif operator == 'IN':
-                    query.filters[column] = {'in': value}
-                elif operator in ['>', '>=', '<', '<=', '!=', '<>']:
-                    query.filters[column] = {operator: value}
-                elif operator == 'BETWEEN':
-                    query.filters[column] = {'between': value}
-                elif operator == 'LIKE':
-                    query.filters[column] = {'like': value}
+            if col and col.semantic_type in _FILTERABLE_TYPES:
+                query.filters[column] = build_filter(value)
     
     def _extract_conditions(self, where: Where) -> List[Tuple[str, str, Any]]:
         """Extract conditions from WHERE clause."""
@@ -273,67 +385,38 @@ class SQLToSemanticTranslator:
         
         # Simple extraction - handles basic comparisons
         # This can be enhanced to handle complex boolean logic
-        tokens = list(where.flatten())
-        i = 0
+        tokens = (token for token in where.flatten() if not token.is_whitespace)
         
-        while i < len(tokens):
-            if tokens[i].ttype in (Name, None) and not tokens[i].is_whitespace:
-                column = str(tokens[i]).strip()
+        for token in tokens:
+            if token.ttype in (Name, None):
+                column = token.value.strip()
                 
-                # Look for operator
-                i += 1
-                while i < len(tokens) and tokens[i].is_whitespace:
-                    i += 1
+                # Operator and value are the next two non-whitespace tokens
+                operator_token = next(tokens, None)
+                value_token = next(tokens, None)
+                if value_token is None:
+                    break
                 
-                if i < len(tokens):
-                    operator = str(tokens[i]).strip().upper()
-                    
-                    # Look for value
-                    i += 1
-                    while i < len(tokens) and tokens[i].is_whitespace:
-                        i += 1
-                    
-                    if i < len(tokens):
-                        value = self._extract_value(tokens[i])
-                        conditions.append((column, operator, value))
-            
-            i += 1
+                # sqlparse upper-cases keyword operators (IN, LIKE) up front
+                operator = operator_token.normalized
+                value = self._extract_value(value_token)
+                conditions.append((column, operator, value))
         
         return conditions
     
     def _extract_value(self, token) -> Any:
-        """Extract value from token."""
+        """Extract value from a leaf token."""
         if token.ttype in Literal.Number:
-            return float(str(token)) if '.' in str(token) else int(str(token))
+            text = token.value
+            return float(text) if '.' in text else int(text)
         elif token.ttype in Literal.String:
             # Remove quotes
-            value = str(token).strip()
+            value = token.value.strip()
             if value.startswith("'") and value.endswith("'"):
                 return value[1:-1]
             return value
         else:
-            return str(token).strip()
-    
-    def _extract_group_by(self, statement) -> List[str]:
-        """Extract GROUP BY columns."""
-        group_by = []
-        group_by_seen = False
-        
-        for token in statement.tokens:
-            if group_by_seen and token.ttype is Keyword:
-                break
-            elif token.ttype is Keyword and 'GROUP' in token.value.upper():
-                group_by_seen = True
-            elif group_by_seen and not token.is_whitespace:
-                if isinstance(token, IdentifierList):
-                    for identifier in token.get_identifiers():
-                        group_by.append(self._extract_column_name(identifier))
-                elif token.ttype is None:
-                    col_name = str(token).strip()
-                    if col_name and col_name != 'BY':
-                        group_by.append(col_name)
-        
-        return group_by
+            return token.value.strip()
     
     def _process_group_by(self, group_by: List[str], table: VirtualTable, query: SemanticQuery):
         """Process GROUP BY columns."""
@@ -343,31 +426,6 @@ class SQLToSemanticTranslator:
                 if col_name not in query.dimensions:
                     query.dimensions.append(col_name)
     
-    def _extract_order_by(self, statement) -> List[Tuple[str, str]]:
-        """Extract ORDER BY columns and directions."""
-        order_by = []
-        order_by_seen = False
-        
-        for token in statement.tokens:
-            if order_by_seen and token.ttype is Keyword and token.value.upper() not in ['ASC', 'DESC']:
-                break
-            elif token.ttype is Keyword and 'ORDER' in token.value.upper():
-                order_by_seen = True
-            elif order_by_seen and not token.is_whitespace:
-                if isinstance(token, IdentifierList):
-                    for identifier in token.get_identifiers():
-                        col_name = self._extract_column_name(identifier)
-                        # Check for ASC/DESC after column
-                        direction = 'asc'  # default
-                        order_by.append((col_name, direction))
-                elif token.ttype is None and str(token).strip() != 'BY':
-                    col_name = str(token).strip()
-                    if col_name:
-                        direction = 'asc'
-                        order_by.append((col_name, direction))
-        
-        return order_by
-    
     def _process_order_by(self, order_by: List[Tuple[str, str]], query: SemanticQuery):
         """Process ORDER BY into query."""
         for col_name, direction in order_by:
@@ -376,46 +434,23 @@ class SQLToSemanticTranslator:
                 'direction': direction
             })
     
-    def _extract_limit(self, statement) -> Optional[int]:
-        """Extract LIMIT value."""
-        limit_seen = False
-        
-        for token in statement.tokens:
-            if limit_seen and token.ttype in Literal.Number:
-                return int(str(token))
-            elif token.ttype is Keyword and token.value.upper() == 'LIMIT':
-                limit_seen = True
-        
-        return None
-    
     def _detect_time_granularity(self, query: SemanticQuery, table: VirtualTable) -> Optional[str]:
         """Detect time granularity from query."""
         # Check if any time dimension is being used
-        time_dims = []
+        time_dims = table.time_dimension_names()
         for dim in query.dimensions:
-            col = table.get_column(dim)
-            if col and col.semantic_type == 'dimension':
-                # Check if it's a time dimension in the model
-                for model_dim in table.semantic_model.get('dimensions', []):
-                    if model_dim['name'] == dim and model_dim.get('type') == 'time':
-                        time_dims.append(dim)
-        
-        # For now, default to 'day' if time dimension is present
-        if time_dims:
-            return 'day'
+            if dim in time_dims:
+                col = table.get_column(dim)
+                if col and col.semantic_type == 'dimension':
+                    # For now, default to 'day' if time dimension is present
+                    return 'day'
         
         return None
     
     # Helper methods
     def _is_keyword(self, value: str) -> bool:
         """Check if value is a SQL keyword."""
-        keywords = {
-            'SELECT', 'FROM', 'WHERE', 'GROUP', 'BY', 'ORDER',
-            'HAVING', 'LIMIT', 'OFFSET', 'JOIN', 'LEFT', 'RIGHT',
-            'INNER', 'OUTER', 'ON', 'AND', 'OR', 'NOT', 'IN',
-            'EXISTS', 'BETWEEN', 'LIKE', 'AS', 'ASC', 'DESC'
-        }
-        return value.upper() in keywords
+        return value.upper() in _SQL_KEYWORDS
     
     def _get_function_name(self, func: Function) -> str:
         """Extract function name."""
@@ -432,14 +467,15 @@ class SQLToSemanticTranslator:
         in_parens = False
         
         for token in func.tokens:
-            if str(token) == '(':
+            text = str(token)
+            if text == '(':
                 in_parens = True
-            elif str(token) == ')':
+            elif text == ')':
                 break
             elif in_parens and not token.is_whitespace:
-                if token.ttype is Punctuation and str(token) == ',':
+                if token.ttype is Punctuation and text == ',':
                     continue
-                args.append(str(token).strip())
+                args.append(text.strip())
         
         return args
     
@@ -456,24 +492,8 @@ class SQLToSemanticTranslator:
         if not args:
             return None
             
-        arg = args[0].lower()
-        
-        # Check semantic model measures
-        for measure in table.semantic_model.get('measures', []):
-            if (measure.get('agg', '').lower() == func_name and
-                measure.get('expr', '').lower() == arg):
-                return measure['name']
-        
-        return None
+        return table.find_measure(func_name, args[0])
     
     def _find_metric_for_measure(self, measure_name: str, table: VirtualTable) -> Optional[str]:
         """Find a metric that uses this measure."""
-        for metric in table.semantic_model.get('metrics', []):
-            if metric.get('type') == 'simple' and metric.get('measure') == measure_name:
-                return metric['name']
-        
-        return None
-
-
-
-
+        return table.find_metric_for_measure(measure_name)
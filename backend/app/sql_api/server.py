@@ -6,11 +6,13 @@ and BI tools to connect and query semantic models as if they were database table
 """
 
 import asyncio
+import itertools
+import json
 import struct
 import hashlib
 import logging
-from typing import Dict, Optional, Any, List, Tuple
-from datetime import datetime
+from typing import Dict, Iterable, Optional, Any, List, Tuple
+from functools import lru_cache
 
 import structlog
 from fastapi import HTTPException
@@ -20,10 +22,59 @@ from .protocol import PostgreSQLProtocol, MessageType, AuthenticationMethod
 from .virtual_schema import VirtualSchemaManager
 from .query_translator import SQLToSemanticTranslator
 from app.services.semantic_parser import SemanticParser
+from app.services.lineage_cache import LineageCache
 from app.integrations.databricks import get_databricks_connector
 
 logger = structlog.get_logger()
 
+# Precompiled wire formats (avoids re-parsing format strings per message)
+_HDR = struct.Struct('!cI')
+_INT_BE = struct.Struct('!I')
+_SIGNED_INT_BE = struct.Struct('!i')
+_BACKEND_KEY = struct.Struct('!cIII')
+_DATA_ROW_HDR = struct.Struct('!cIH')
+_DATA_ROW_PLACEHOLDER = bytes(_DATA_ROW_HDR.size)
+_NULL_LENGTH = _SIGNED_INT_BE.pack(-1)
+
+# Buffered result rows are flushed to the client past this size, so large
+# results are not held in memory twice and the client applies backpressure
+_RESPONSE_FLUSH_BYTES = 64 * 1024
+
+# Flushed chunks are only drained once the transport holds more than this,
+# rather than yielding to the event loop after every chunk
+_WRITE_BUFFER_HIGH_WATER = 256 * 1024
+
+# Leading characters of a simple query inspected to route it, including the
+# keywords SHOW commands are told apart by
+_QUERY_HEAD_CHARS = 64
+
+
+def _parameter_status(name: str, value: str) -> bytes:
+    """ParameterStatus message reporting a server setting."""
+    body = name.encode('utf-8') + b'\x00' + value.encode('utf-8') + b'\x00'
+    return _HDR.pack(b'S', 4 + len(body)) + body
+
+
+# Settings reported to every client at startup; they never change, so the
+# messages are encoded once
+_STARTUP_PARAMETER_STATUS = b''.join([
+    _parameter_status('server_version', '14.0 (Semantic Layer)'),
+    _parameter_status('server_encoding', 'UTF8'),
+    _parameter_status('client_encoding', 'UTF8'),
+    _parameter_status('DateStyle', 'ISO, MDY'),
+    _parameter_status('TimeZone', 'UTC'),
+])
+
+
+@lru_cache(maxsize=512)
+def _row_description(protocol: PostgreSQLProtocol, columns: Tuple[Tuple[str, str], ...]) -> bytes:
+    """RowDescription message for a column list.
+    
+    The same statements keep returning the same columns, so the encoded
+    names and type OIDs are built once per distinct column list.
+    """
+    return protocol.build_row_description(columns)
+
 
 class SQLServer:
     """PostgreSQL-compatible SQL server for semantic layer."""
@@ -43,11 +94,25 @@ class SQLServer:
         # Initialize components
         self.protocol = PostgreSQLProtocol()
         self.schema_manager = VirtualSchemaManager()
-        self.query_translator = SQLToSemanticTranslator()
+        self.query_translator = SQLToSemanticTranslator(schema_manager=self.schema_manager)
         self.semantic_parser = SemanticParser()
         
-        # Connection tracking
-        self.connections: Dict[str, 'ClientConnection'] = {}
+        # Short-lived cache of query results, keyed by schema version, user,
+        # database and the translated semantic query
+        self.result_cache: Optional[LineageCache] = None
+        if settings.SQL_RESULT_CACHE_ENABLED:
+            self.result_cache = LineageCache(
+                default_ttl_seconds=settings.SQL_RESULT_CACHE_TTL_SECONDS,
+                max_size=settings.SQL_RESULT_CACHE_MAX_SIZE,
+                name="sql_result"
+            )
+        
+        # Connection tracking: one slot per allowed connection, plus a
+        # stack of free slot indexes so accept and release are O(1)
+        self.connections: List[Optional['ClientConnection']] = [None] * max_connections
+        self._free_slots: List[int] = list(range(max_connections - 1, -1, -1))
+        # Sequence number making connection ids unique per server
+        self._conn_seq = itertools.count(1)
         self.server: Optional[asyncio.Server] = None
         
         logger.info(
@@ -85,8 +150,9 @@ class SQLServer:
             self.server.close()
             await self.server.wait_closed()
             
-            # Close all client connections
-            for conn_id, connection in self.connections.items():
+            # Close all client connections; closing frees their slots,
+            # so iterate over a snapshot
+            for connection in [conn for conn in self.connections if conn is not None]:
                 await connection.close()
             
             logger.info("SQL Server stopped")
@@ -94,12 +160,12 @@ class SQLServer:
     async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         """Handle a new client connection."""
         client_addr = writer.get_extra_info('peername')
-        conn_id = f"{client_addr[0]}:{client_addr[1]}_{datetime.utcnow().timestamp()}"
+        conn_id = f"{client_addr[0]}:{client_addr[1]}_{next(self._conn_seq)}"
         
         logger.info(f"New SQL connection from {client_addr}")
         
         # Check connection limit
-        if len(self.connections) >= self.max_connections:
+        if not self._free_slots:
             logger.warning(f"Connection limit reached, rejecting {client_addr}")
             writer.close()
             await writer.wait_closed()
@@ -113,7 +179,8 @@ class SQLServer:
             server=self
         )
         
-        self.connections[conn_id] = connection
+        slot = self._free_slots.pop()
+        self.connections[slot] = connection
         
         try:
             await connection.handle()
@@ -121,8 +188,8 @@ class SQLServer:
             logger.error(f"Error handling client {conn_id}: {e}")
         finally:
             # Clean up connection
-            if conn_id in self.connections:
-                del self.connections[conn_id]
+            self.connections[slot] = None
+            self._free_slots.append(slot)
             writer.close()
             await writer.wait_closed()
 
@@ -130,6 +197,17 @@ class SQLServer:
 class ClientConnection:
     """Handles a single client connection."""
     
+    # Frontend message type -> name of the method handling it
+    _HANDLERS: Dict[int, str] = {
+        ord('Q'): 'handle_simple_query',  # Simple query
+        ord('P'): 'handle_parse',  # Parse (prepared statement)
+        ord('B'): 'handle_bind',  # Bind
+        ord('E'): 'handle_execute',  # Execute
+        ord('D'): 'handle_describe',  # Describe
+        ord('S'): 'handle_sync',  # Sync
+        ord('X'): '_terminate',  # Terminate
+    }
+    
     def __init__(
         self,
         conn_id: str,
@@ -161,28 +239,20 @@ class ClientConnection:
             
             # Main command loop
             while True:
-                # Read message type
-                msg_type = await self.reader.read(1)
-                if not msg_type:
+                # read() may return short on large messages, so read whole
+                # frames; a connection closed mid-frame ends the loop
+                try:
+                    # Read message type and length
+                    header = await self.reader.readexactly(5)
+                    length = _INT_BE.unpack_from(header, 1)[0] - 4
+                    
+                    # Read message body
+                    body = await self.reader.readexactly(length) if length > 0 else b''
+                except asyncio.IncompleteReadError:
                     break
                 
-                # Read message length
-                length_bytes = await self.reader.read(4)
-                if len(length_bytes) < 4:
-                    break
-                
-                length = struct.unpack('!I', length_bytes)[0] - 4
-                
-                # Read message body
-                if length > 0:
-                    body = await self.reader.read(length)
-                    if len(body) < length:
-                        break
-                else:
-                    body = b''
-                
                 # Handle message
-                await self.handle_message(msg_type[0], body)
+                await self.handle_message(header[0], body)
                 
         except asyncio.CancelledError:
             raise
@@ -193,11 +263,11 @@ class ClientConnection:
     async def handle_startup(self):
         """Handle connection startup and authentication."""
         # Read startup message length
-        length_bytes = await self.reader.read(4)
-        length = struct.unpack('!I', length_bytes)[0] - 4
+        length_bytes = await self.reader.readexactly(4)
+        length = _INT_BE.unpack(length_bytes)[0] - 4
         
         # Read startup message
-        startup_data = await self.reader.read(length)
+        startup_data = await self.reader.readexactly(length)
         
         # Parse startup parameters
         params = self.protocol.parse_startup_message(startup_data)
@@ -211,115 +281,149 @@ class ClientConnection:
             application=params.get('application_name', 'unknown')
         )
         
+        # The whole handshake goes out in a single write and drain
+        buf = bytearray()
+        
         # Send authentication request (we'll use trust auth for now)
-        await self.send_authentication_ok()
+        await self.send_authentication_ok(buf=buf)
         
         # Send backend key data
-        await self.send_backend_key_data()
+        await self.send_backend_key_data(buf=buf)
         
         # Send parameter status messages
-        await self.send_parameter_status('server_version', '14.0 (Semantic Layer)')
-        await self.send_parameter_status('server_encoding', 'UTF8')
-        await self.send_parameter_status('client_encoding', 'UTF8')
-        await self.send_parameter_status('DateStyle', 'ISO, MDY')
-        await self.send_parameter_status('TimeZone', 'UTC')
+        buf += _STARTUP_PARAMETER_STATUS
         
         # Send ready for query
-        await self.send_ready_for_query()
+        await self.send_ready_for_query(buf=buf)
+        
+        self.writer.write(bytes(buf))
+        await self.writer.drain()
         
         self.authenticated = True
     
     async def handle_message(self, msg_type: int, body: bytes):
         """Route message to appropriate handler."""
-        if msg_type == ord('Q'):  # Simple query
-            await self.handle_simple_query(body)
-        elif msg_type == ord('P'):  # Parse (prepared statement)
-            await self.handle_parse(body)
-        elif msg_type == ord('B'):  # Bind
-            await self.handle_bind(body)
-        elif msg_type == ord('E'):  # Execute
-            await self.handle_execute(body)
-        elif msg_type == ord('D'):  # Describe
-            await self.handle_describe(body)
-        elif msg_type == ord('S'):  # Sync
-            await self.handle_sync()
-        elif msg_type == ord('X'):  # Terminate
-            logger.info(f"Client {self.conn_id} terminated connection")
-            raise asyncio.CancelledError()
-        else:
+        handler_name = self._HANDLERS.get(msg_type)
+        if handler_name is None:
             logger.warning(f"Unknown message type: {chr(msg_type)}")
+            return
+        await getattr(self, handler_name)(body)
+    
+    async def _terminate(self, body: bytes):
+        """Handle a Terminate message by ending the connection loop."""
+        logger.info(f"Client {self.conn_id} terminated connection")
+        raise asyncio.CancelledError()
     
     async def handle_simple_query(self, body: bytes):
         """Handle simple query protocol."""
-        # Extract query string (null-terminated)
-        query = body.rstrip(b'\x00').decode('utf-8')
+        # Extract query string (null-terminated); decoding through a
+        # memoryview avoids copying the body just to drop the terminator
+        end = len(body)
+        while end and body[end - 1] == 0:
+            end -= 1
+        query = str(memoryview(body)[:end], 'utf-8')
         
         logger.info(f"SQL query from {self.conn_id}: {query[:100]}...")
         
+        # The whole response goes out in a single write
+        buf = bytearray()
+        
         try:
+            # Special queries are recognised from an upper-cased prefix, so
+            # long queries are not upper-cased in full
+            head = query[:_QUERY_HEAD_CHARS].upper()
+            
             # Check for special queries
-            if query.upper().startswith('SELECT VERSION()'):
-                await self.send_query_response(
+            if head.startswith('SELECT VERSION()'):
+                row_count = await self.send_query_response(
                     columns=[('version', 'text')],
-                    rows=[['PostgreSQL 14.0 (Semantic Layer)']]
+                    rows=[['PostgreSQL 14.0 (Semantic Layer)']],
+                    buf=buf
                 )
-            elif query.upper().startswith('SHOW'):
-                await self.handle_show_command(query)
-            elif query.upper() == 'SELECT 1':
+            elif head.startswith('SHOW'):
+                row_count = await self.handle_show_command(query, head, buf=buf)
+            elif head == 'SELECT 1' and len(query) <= _QUERY_HEAD_CHARS:
                 # Common connection test query
-                await self.send_query_response(
+                row_count = await self.send_query_response(
                     columns=[('?column?', 'integer')],
-                    rows=[[1]]
+                    rows=[[1]],
+                    buf=buf
                 )
             else:
-                # Translate SQL to semantic query
-                semantic_query = await self.server.query_translator.translate(query)
-                
-                # Execute semantic query
-                results = await self.execute_semantic_query(semantic_query)
+                # Translate and execute, or reuse a recent result
+                results = await self.execute_sql_query(query)
                 
                 # Send results
-                await self.send_query_response(
+                row_count = await self.send_query_response(
                     columns=results['columns'],
-                    rows=results['rows']
+                    rows=results['rows'],
+                    buf=buf
                 )
             
             # Send command complete
-            await self.send_command_complete(f"SELECT {len(results.get('rows', []))}")
+            await self.send_command_complete(f"SELECT {row_count}", buf=buf)
             
         except Exception as e:
             logger.error(f"Query execution error: {e}")
-            await self.send_error_response(str(e))
+            await self.send_error_response(str(e), buf=buf)
         
         finally:
-            await self.send_ready_for_query()
+            await self.send_ready_for_query(buf=buf)
+            self.writer.write(buf)
+            await self.writer.drain()
     
-    async def handle_show_command(self, query: str):
-        """Handle SHOW commands for PostgreSQL compatibility."""
-        query_upper = query.upper()
+    async def handle_show_command(
+        self,
+        query: str,
+        head: str,
+        buf: Optional[bytearray] = None
+    ) -> int:
+        """Handle SHOW commands for PostgreSQL compatibility; returns the row count.
         
-        if 'DATABASES' in query_upper or 'SCHEMAS' in query_upper:
+        ``head`` is the upper-cased query prefix already computed by the caller.
+        """
+        if 'DATABASES' in head or 'SCHEMAS' in head:
             # Show available schemas (semantic models)
-            models = self.server.schema_manager.get_all_models()
-            rows = [[model] for model in models]
-            await self.send_query_response(
+            return await self.send_query_response(
                 columns=[('schema_name', 'text')],
-                rows=rows
+                rows=self.server.schema_manager.model_rows(),
+                buf=buf
             )
-        elif 'TABLES' in query_upper:
+        elif 'TABLES' in head:
             # Show tables in current schema
             if self.database:
-                tables = self.server.schema_manager.get_tables(self.database)
-                rows = [[table['name'], table['type']] for table in tables]
-                await self.send_query_response(
+                return await self.send_query_response(
                     columns=[('table_name', 'text'), ('table_type', 'text')],
-                    rows=rows
+                    rows=self.server.schema_manager.table_rows(self.database),
+                    buf=buf
                 )
             else:
-                await self.send_query_response(columns=[('table_name', 'text')], rows=[])
+                return await self.send_query_response(columns=[('table_name', 'text')], rows=[], buf=buf)
         else:
             # Generic SHOW command response
-            await self.send_query_response(columns=[('result', 'text')], rows=[['OK']])
+            return await self.send_query_response(columns=[('result', 'text')], rows=[['OK']], buf=buf)
+    
+    async def execute_sql_query(self, query: str) -> Dict[str, Any]:
+        """Translate and execute a SQL query, using the result cache if enabled."""
+        translator = self.server.query_translator
+        cache = self.server.result_cache
+        if cache is None:
+            return await self.execute_semantic_query(translator.translate(query))
+        
+        # Keying on the translation folds together SQL spellings of the same
+        # query; the schema version drops entries when models are reloaded,
+        # since a changed measure definition translates to the same query
+        schema_version = translator.schema_manager.version
+        semantic_query = translator.translate_bytes(query)
+        cache_key = (
+            f"sql:{schema_version}:{self.username}:{self.database}:"
+            f"{semantic_query.decode('utf-8')}"
+        )
+        results = cache.get(cache_key)
+        if results is None:
+            results = await self.execute_semantic_query(json.loads(semantic_query))
+            cache.set(cache_key, results)
+        return results
     
     async def execute_semantic_query(self, semantic_query: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a semantic query and return results."""
@@ -342,93 +446,120 @@ class ClientConnection:
             raise
     
     # Protocol helper methods
-    async def send_authentication_ok(self):
-        """Send authentication OK response."""
-        msg = struct.pack('!cI', b'R', 8)  # Type R, length 8
-        msg += struct.pack('!I', 0)  # Auth OK
+    #
+    # Each send_* helper writes its message and drains, unless given a
+    # buffer; then the message is appended to it for the caller to write.
+    async def _send(self, msg: bytes, buf: Optional[bytearray] = None):
+        """Write a message, or append it to a pending response buffer."""
+        if buf is not None:
+            buf += msg
+            return
         self.writer.write(msg)
         await self.writer.drain()
     
-    async def send_backend_key_data(self):
+    async def send_authentication_ok(self, buf: Optional[bytearray] = None):
+        """Send authentication OK response."""
+        msg = _HDR.pack(b'R', 8)  # Type R, length 8
+        msg += _INT_BE.pack(0)  # Auth OK
+        await self._send(msg, buf)
+    
+    async def send_backend_key_data(self, buf: Optional[bytearray] = None):
         """Send backend key data for cancellation."""
-        msg = struct.pack('!cI', b'K', 12)  # Type K, length 12
-        msg += struct.pack('!II', 12345, 67890)  # Process ID and secret key
-        self.writer.write(msg)
-        await self.writer.drain()
+        # Type K, length 12, process ID and secret key
+        msg = _BACKEND_KEY.pack(b'K', 12, 12345, 67890)
+        await self._send(msg, buf)
     
-    async def send_parameter_status(self, name: str, value: str):
+    async def send_parameter_status(self, name: str, value: str, buf: Optional[bytearray] = None):
         """Send parameter status message."""
-        body = name.encode('utf-8') + b'\x00' + value.encode('utf-8') + b'\x00'
-        msg = struct.pack('!cI', b'S', 4 + len(body)) + body
-        self.writer.write(msg)
-        await self.writer.drain()
+        await self._send(_parameter_status(name, value), buf)
     
-    async def send_ready_for_query(self):
+    async def send_ready_for_query(self, buf: Optional[bytearray] = None):
         """Send ready for query message."""
-        msg = struct.pack('!cI', b'Z', 5)  # Type Z, length 5
+        msg = _HDR.pack(b'Z', 5)  # Type Z, length 5
         msg += self.transaction_status.encode('ascii')  # Transaction status
-        self.writer.write(msg)
-        await self.writer.drain()
+        await self._send(msg, buf)
     
-    async def send_query_response(self, columns: List[Tuple[str, str]], rows: List[List[Any]]):
-        """Send query results."""
+    async def send_query_response(
+        self,
+        columns: List[Tuple[str, str]],
+        rows: Iterable[List[Any]],
+        buf: Optional[bytearray] = None
+    ) -> int:
+        """Send query results; returns the number of rows sent.
+        
+        Rows are encoded as they are consumed, so rows may be any iterable.
+        Whatever has been encoded is flushed once it passes
+        _RESPONSE_FLUSH_BYTES; the rest is left in buf, when given.
+        """
+        out = bytearray() if buf is None else buf
+        row_count = 0
+        
         # Send RowDescription
-        body = struct.pack('!H', len(columns))  # Number of fields
-        
-        for col_name, col_type in columns:
-            # Field name
-            body += col_name.encode('utf-8') + b'\x00'
-            # Table OID (0 for no table)
-            body += struct.pack('!I', 0)
-            # Column number (0)
-            body += struct.pack('!H', 0)
-            # Type OID (25 for text, 23 for integer, etc.)
-            type_oid = self.protocol.get_type_oid(col_type)
-            body += struct.pack('!I', type_oid)
-            # Type size (-1 for variable)
-            body += struct.pack('!h', -1)
-            # Type modifier (-1)
-            body += struct.pack('!I', 4294967295)  # -1 as unsigned
-            # Format code (0 for text)
-            body += struct.pack('!H', 0)
-        
-        msg = struct.pack('!cI', b'T', 4 + len(body)) + body
-        self.writer.write(msg)
+        try:
+            out += _row_description(self.protocol, tuple(columns))
+        except TypeError:
+            # Unhashable column entries; build without the cache
+            out += self.protocol.build_row_description(columns)
         
-        # Send DataRow messages
+        # Send DataRow messages, encoded straight into the response; the
+        # header is packed over a placeholder once the row length is known
+        pack_length = _INT_BE.pack
         for row in rows:
-            row_body = struct.pack('!H', len(row))  # Number of values
+            start = len(out)
+            out += _DATA_ROW_PLACEHOLDER
             
-            for value in row:
-                if value is None:
-                    row_body += struct.pack('!i', -1)  # NULL
-                else:
-                    value_bytes = str(value).encode('utf-8')
-                    row_body += struct.pack('!I', len(value_bytes))
-                    row_body += value_bytes
+            try:
+                for value in row:
+                    if value is None:
+                        out += _NULL_LENGTH
+                        continue
+                    
+                    # Text format; the common cell types skip str()
+                    value_type = type(value)
+                    if value_type is str:
+                        value_bytes = value.encode('utf-8')
+                    elif value_type is int:
+                        value_bytes = b'%d' % value
+                    else:
+                        value_bytes = str(value).encode('utf-8')
+                    out += pack_length(len(value_bytes))
+                    out += value_bytes
+            except BaseException:
+                # Drop the half-built row, so an error response appended
+                # after it still follows whole messages
+                del out[start:]
+                raise
             
-            msg = struct.pack('!cI', b'D', 4 + len(row_body)) + row_body
-            self.writer.write(msg)
+            _DATA_ROW_HDR.pack_into(out, start, b'D', len(out) - start - 1, len(row))
+            row_count += 1
+            
+            if len(out) >= _RESPONSE_FLUSH_BYTES:
+                # Copy out, as the transport may hold on to what it is given
+                self.writer.write(bytes(out))
+                out.clear()
+                if self.writer.transport.get_write_buffer_size() > _WRITE_BUFFER_HIGH_WATER:
+                    await self.writer.drain()
         
-        await self.writer.drain()
+        if buf is None:
+            self.writer.write(out)
+            await self.writer.drain()
+        return row_count
     
-    async def send_command_complete(self, tag: str):
+    async def send_command_complete(self, tag: str, buf: Optional[bytearray] = None):
         """Send command complete message."""
         body = tag.encode('utf-8') + b'\x00'
-        msg = struct.pack('!cI', b'C', 4 + len(body)) + body
-        self.writer.write(msg)
-        await self.writer.drain()
+        msg = _HDR.pack(b'C', 4 + len(body)) + body
+        await self._send(msg, buf)
     
-    async def send_error_response(self, message: str):
+    async def send_error_response(self, message: str, buf: Optional[bytearray] = None):
         """Send error response."""
         body = b'S' + b'ERROR\x00'  # Severity
         body += b'C' + b'42P01\x00'  # Error code
         body += b'M' + message.encode('utf-8') + b'\x00'  # Message
         body += b'\x00'  # Terminator
         
-        msg = struct.pack('!cI', b'E', 4 + len(body)) + body
-        self.writer.write(msg)
-        await self.writer.drain()
+        msg = _HDR.pack(b'E', 4 + len(body)) + body
+        await self._send(msg, buf)
     
     async def close(self):
         """Close the client connection."""
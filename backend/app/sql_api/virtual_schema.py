@@ -7,17 +7,76 @@ allowing SQL clients to query semantic models as if they were regular database t
 
 import os
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Any, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
 
 import structlog
 
+# libyaml's C loader parses several times faster; it is optional in PyYAML
+try:
+    from yaml import CSafeLoader as _YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as _YAMLLoader
+
 logger = structlog.get_logger()
 
+# Model files read concurrently on reload
+_MODEL_LOAD_WORKERS = 8
+
+# information_schema.columns row; per column only the table, name, position,
+# nullability and type are filled in
+_COLUMN_ROW_TEMPLATE: Dict[str, Any] = {
+    'table_catalog': 'semantic_layer',
+    'table_schema': None,
+    'table_name': None,
+    'column_name': None,
+    'ordinal_position': None,
+    'column_default': None,
+    'is_nullable': None,
+    'data_type': None,
+    'character_maximum_length': None,
+    'character_octet_length': None,
+    'numeric_precision': None,
+    'numeric_precision_radix': None,
+    'numeric_scale': None,
+    'datetime_precision': None,
+    'interval_type': None,
+    'interval_precision': None,
+    'character_set_catalog': None,
+    'character_set_schema': None,
+    'character_set_name': None,
+    'collation_catalog': None,
+    'collation_schema': None,
+    'collation_name': None,
+    'domain_catalog': None,
+    'domain_schema': None,
+    'domain_name': None,
+    'udt_catalog': None,
+    'udt_schema': None,
+    'udt_name': None,
+    'scope_catalog': None,
+    'scope_schema': None,
+    'scope_name': None,
+    'maximum_cardinality': None,
+    'dtd_identifier': None,
+    'is_self_referencing': 'NO',
+    'is_identity': 'NO',
+    'identity_generation': None,
+    'identity_start': None,
+    'identity_increment': None,
+    'identity_maximum': None,
+    'identity_minimum': None,
+    'identity_cycle': 'NO',
+    'is_generated': 'NEVER',
+    'generation_expression': None,
+    'is_updatable': 'NO'
+}
+
 
-@dataclass
+@dataclass(slots=True)
 class VirtualColumn:
     """Represents a virtual column in a SQL table."""
     name: str
@@ -39,7 +98,7 @@ class VirtualColumn:
         return sql
 
 
-@dataclass
+@dataclass(slots=True)
 class VirtualTable:
     """Represents a virtual table backed by a semantic model."""
     schema_name: str
@@ -47,13 +106,59 @@ class VirtualTable:
     columns: List[VirtualColumn]
     semantic_model: Dict[str, Any]
     description: Optional[str] = None
+    # Lower-cased column name -> column, built on first lookup
+    _column_index: Optional[Dict[str, VirtualColumn]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # (agg, expr) -> measure name and measure name -> simple metric name,
+    # built from the semantic model on first lookup
+    _measure_index: Optional[Dict[Tuple[str, str], str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _metric_index: Optional[Dict[str, str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _time_dimensions: Optional[FrozenSet[str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def get_column(self, name: str) -> Optional[VirtualColumn]:
-        """Get column by name."""
-        for col in self.columns:
-            if col.name.lower() == name.lower():
-                return col
-        return None
+        """Get column by name (case-insensitive)."""
+        if self._column_index is None:
+            index: Dict[str, VirtualColumn] = {}
+            for col in self.columns:
+                index.setdefault(col.name.lower(), col)
+            self._column_index = index
+        return self._column_index.get(name.lower())
+    
+    def find_measure(self, agg: str, expr: str) -> Optional[str]:
+        """Get the name of the model measure aggregating expr with agg."""
+        if self._measure_index is None:
+            index: Dict[Tuple[str, str], str] = {}
+            for measure in self.semantic_model.get('measures', []):
+                key = (measure.get('agg', '').lower(), measure.get('expr', '').lower())
+                index.setdefault(key, measure['name'])
+            self._measure_index = index
+        return self._measure_index.get((agg.lower(), expr.lower()))
+    
+    def find_metric_for_measure(self, measure_name: str) -> Optional[str]:
+        """Get the name of the simple metric defined on a measure."""
+        if self._metric_index is None:
+            index: Dict[str, str] = {}
+            for metric in self.semantic_model.get('metrics', []):
+                if metric.get('type') == 'simple' and 'measure' in metric:
+                    index.setdefault(metric['measure'], metric['name'])
+            self._metric_index = index
+        return self._metric_index.get(measure_name)
+    
+    def time_dimension_names(self) -> FrozenSet[str]:
+        """Get the names of the semantic model's time dimensions."""
+        if self._time_dimensions is None:
+            self._time_dimensions = frozenset(
+                dim['name'] for dim in self.semantic_model.get('dimensions', [])
+                if dim.get('type') == 'time'
+            )
+        return self._time_dimensions
     
     def to_create_table_sql(self) -> str:
         """Generate CREATE TABLE statement."""
@@ -107,6 +212,21 @@ class VirtualSchemaManager:
         self.models_path = Path(models_path)
         self.schemas: Dict[str, Dict[str, VirtualTable]] = {}
         self.tables: Dict[str, VirtualTable] = {}
+        # Bumped whenever the loaded models change, so derived caches can
+        # tell when they are stale
+        self.version = 0
+        # Table reference -> table, valid for _resolved_version only
+        self._resolved: Dict[str, Optional[VirtualTable]] = {}
+        self._resolved_version = 0
+        # Catalog listings served to SQL clients, valid for _listings_version only
+        self._listings: Dict[Tuple[str, Optional[str]], Tuple[Any, ...]] = {}
+        self._listings_version = 0
+        # Unqualified table reference -> first table it names, built from
+        # self.tables for _tables_by_suffix_version only
+        self._tables_by_suffix: Dict[str, VirtualTable] = {}
+        self._tables_by_suffix_version = -1
+        # Semantic type as written in the model -> SQL type
+        self._sql_types: Dict[str, str] = {}
         
         # Load all semantic models
         self.reload_models()
@@ -115,23 +235,50 @@ class VirtualSchemaManager:
         """Reload all semantic models from disk."""
         self.schemas.clear()
         self.tables.clear()
+        self.version += 1
         
         if not self.models_path.exists():
             logger.warning(f"Semantic models path does not exist: {self.models_path}")
             return
         
-        # Load each YAML file
-        for yaml_file in self.models_path.glob("*.yml"):
+        yaml_files = list(self.models_path.glob("*.yml"))
+        if not yaml_files:
+            return
+        
+        # Read and parse the files concurrently, then build the tables on
+        # this thread in the original order
+        with ThreadPoolExecutor(max_workers=min(len(yaml_files), _MODEL_LOAD_WORKERS)) as executor:
+            results = list(executor.map(self._read_model_file_safe, yaml_files))
+        
+        for yaml_file, (content, error) in zip(yaml_files, results):
             try:
-                self.load_model_file(yaml_file)
+                if error is not None:
+                    raise error
+                self._install_model(yaml_file, content)
             except Exception as e:
                 logger.error(f"Failed to load model {yaml_file}: {e}")
     
+    @staticmethod
+    def _read_model_file(file_path: Path) -> Any:
+        """Read and parse a semantic model file without loading it."""
+        # Bytes go straight to the parser, which handles the decoding
+        with open(file_path, 'rb') as f:
+            return yaml.load(f, Loader=_YAMLLoader)
+    
+    @classmethod
+    def _read_model_file_safe(cls, file_path: Path) -> Tuple[Any, Optional[Exception]]:
+        """Read a model file, returning the error instead of raising it."""
+        try:
+            return cls._read_model_file(file_path), None
+        except Exception as e:
+            return None, e
+    
     def load_model_file(self, file_path: Path) -> None:
         """Load a single semantic model file."""
-        with open(file_path, 'r') as f:
-            content = yaml.safe_load(f)
-        
+        self._install_model(file_path, self._read_model_file(file_path))
+    
+    def _install_model(self, file_path: Path, content: Any) -> None:
+        """Build and register the virtual tables for parsed model content."""
         if not content:
             return
         
@@ -156,6 +303,7 @@ class VirtualSchemaManager:
         # Store in schema
         schema_name = f"sem_{model_name}"
         self.schemas[schema_name] = {}
+        self.version += 1
         
         # Add fact table
         self.schemas[schema_name][fact_table.table_name] = fact_table
@@ -240,13 +388,16 @@ class VirtualSchemaManager:
         """Create views for each metric."""
         views = []
         
+        # The same dimensions go into every view, so pick them once per model
+        dimensions = model_data.get('dimensions', [])
+        time_dims = [d for d in dimensions if d.get('type') == 'time']
+        cat_dims = [d for d in dimensions if d.get('type') == 'categorical'][:3]
+        
         for metric in model_data.get('metrics', []):
             # Create a simple view with the metric and common dimensions
             columns = []
             
             # Add time dimension if exists
-            time_dims = [d for d in model_data.get('dimensions', []) 
-                        if d.get('type') == 'time']
             if time_dims:
                 columns.append(VirtualColumn(
                     name=time_dims[0]['name'],
@@ -256,8 +407,6 @@ class VirtualSchemaManager:
                 ))
             
             # Add categorical dimensions (limit to most common ones)
-            cat_dims = [d for d in model_data.get('dimensions', []) 
-                       if d.get('type') == 'categorical'][:3]
             for dim in cat_dims:
                 columns.append(VirtualColumn(
                     name=dim['name'],
@@ -286,8 +435,17 @@ class VirtualSchemaManager:
         return views
     
     def map_semantic_type_to_sql(self, semantic_type: str) -> str:
-        """Map semantic type to SQL type."""
-        return self.TYPE_MAPPINGS.get(semantic_type.lower(), 'text')
+        """Map semantic type to SQL type.
+        
+        Models reuse a handful of type names, so each spelling is lower-cased
+        and looked up once.
+        """
+        sql_type = self._sql_types.get(semantic_type)
+        if sql_type is None:
+            if len(self._sql_types) >= 256:
+                self._sql_types.clear()
+            sql_type = self._sql_types[semantic_type] = self.TYPE_MAPPINGS.get(semantic_type.lower(), 'text')
+        return sql_type
     
     def get_all_schemas(self) -> List[str]:
         """Get all virtual schema names."""
@@ -318,23 +476,50 @@ class VirtualSchemaManager:
     
     def get_tables(self, database: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all tables, optionally filtered by database/schema."""
-        tables = []
-        
         if database and database in self.schemas:
             # Single schema
             return self.get_schema_tables(database)
-        else:
-            # All schemas
-            for schema_name in self.schemas:
-                for table_name, table in self.schemas[schema_name].items():
-                    tables.append({
-                        'schema': schema_name,
-                        'name': table_name,
-                        'type': 'VIEW' if table_name.startswith('v_') else 'TABLE',
-                        'columns': len(table.columns)
-                    })
         
-        return tables
+        # All schemas
+        return [
+            {
+                'schema': schema_name,
+                'name': table_name,
+                'type': 'VIEW' if table_name.startswith('v_') else 'TABLE',
+                'columns': len(table.columns)
+            }
+            for schema_name, schema_tables in self.schemas.items()
+            for table_name, table in schema_tables.items()
+        ]
+    
+    def model_rows(self) -> Tuple[Tuple[str], ...]:
+        """Get one (model_name,) row per semantic model, memoized until the models change."""
+        return self._listing(('models', None), lambda: tuple((model,) for model in self.get_all_models()))
+    
+    def table_rows(self, database: Optional[str] = None) -> Tuple[Tuple[str, str], ...]:
+        """Get (table_name, table_type) rows as listed by get_tables, memoized until the models change."""
+        return self._listing(
+            ('tables', database),
+            lambda: tuple((table['name'], table['type']) for table in self.get_tables(database))
+        )
+    
+    def _listing(self, key: Tuple[str, Optional[str]], build) -> Tuple[Any, ...]:
+        """Return a memoized listing, rebuilding all of them after a reload.
+        
+        SQL clients poll the catalog on every connect; the listings only
+        change when the models do, so they are built once per version.
+        """
+        if self._listings_version != self.version:
+            self._listings.clear()
+            self._listings_version = self.version
+        
+        rows = self._listings.get(key)
+        if rows is None:
+            # Keyed by the client's database, so keep the map bounded
+            if len(self._listings) >= 256:
+                self._listings.clear()
+            rows = self._listings[key] = build()
+        return rows
     
     def get_table(self, table_ref: str) -> Optional[VirtualTable]:
         """Get a table by reference (schema.table or just table)."""
@@ -343,11 +528,46 @@ class VirtualSchemaManager:
             return self.tables[table_ref]
         
         # Check without schema (search all schemas)
-        for full_ref, table in self.tables.items():
-            if full_ref.endswith(f".{table_ref}"):
-                return table
+        if self._tables_by_suffix_version != self.version:
+            self._index_tables_by_suffix()
+        return self._tables_by_suffix.get(table_ref)
+    
+    def _index_tables_by_suffix(self) -> None:
+        """Index tables by every reference that ends a full reference after a dot.
         
-        return None
+        A reference then names the first table, in load order, whose full
+        reference ends with ".<reference>", without scanning all tables.
+        """
+        index: Dict[str, VirtualTable] = {}
+        for full_ref, table in self.tables.items():
+            dot = full_ref.find('.')
+            while dot != -1:
+                index.setdefault(full_ref[dot + 1:], table)
+                dot = full_ref.find('.', dot + 1)
+        self._tables_by_suffix = index
+        self._tables_by_suffix_version = self.version
+    
+    def resolve(self, table_ref: str) -> Optional[VirtualTable]:
+        """Get a table by reference, memoized until the models change.
+        
+        Unqualified references otherwise scan every loaded table. Resolved
+        tables keep their column, measure and time-dimension indexes, so
+        repeated queries against a table reuse them.
+        """
+        if self._resolved_version != self.version:
+            self._resolved.clear()
+            self._resolved_version = self.version
+        
+        try:
+            return self._resolved[table_ref]
+        except KeyError:
+            pass
+        
+        # Misses are cached too, so keep unknown references from piling up
+        if len(self._resolved) >= 1024:
+            self._resolved.clear()
+        table = self._resolved[table_ref] = self.get_table(table_ref)
+        return table
     
     def get_table_columns(self, table_ref: str) -> List[Dict[str, Any]]:
         """Get columns for a table."""
@@ -374,7 +594,14 @@ class VirtualSchemaManager:
         return columns
     
     def get_information_schema_tables(self) -> List[Dict[str, Any]]:
-        """Get tables for information_schema.tables view."""
+        """Get tables for information_schema.tables view.
+        
+        Rows are built once per model version; the list is a fresh copy, but
+        the row dicts are shared and must not be modified.
+        """
+        return list(self._listing(('information_schema.tables', None), self._build_information_schema_tables))
+    
+    def _build_information_schema_tables(self) -> Tuple[Dict[str, Any], ...]:
         rows = []
         
         for schema_name in self.schemas:
@@ -394,63 +621,31 @@ class VirtualSchemaManager:
                     'commit_action': None
                 })
         
-        return rows
+        return tuple(rows)
     
     def get_information_schema_columns(self) -> List[Dict[str, Any]]:
-        """Get columns for information_schema.columns view."""
+        """Get columns for information_schema.columns view.
+        
+        Cached like get_information_schema_tables.
+        """
+        return list(self._listing(('information_schema.columns', None), self._build_information_schema_columns))
+    
+    def _build_information_schema_columns(self) -> Tuple[Dict[str, Any], ...]:
         rows = []
         
         for schema_name in self.schemas:
             for table_name, table in self.schemas[schema_name].items():
                 for idx, col in enumerate(table.columns):
-                    rows.append({
-                        'table_catalog': 'semantic_layer',
-                        'table_schema': schema_name,
-                        'table_name': table_name,
-                        'column_name': col.name,
-                        'ordinal_position': idx + 1,
-                        'column_default': None,
-                        'is_nullable': 'YES' if col.is_nullable else 'NO',
-                        'data_type': col.data_type,
-                        'character_maximum_length': None,
-                        'character_octet_length': None,
-                        'numeric_precision': None,
-                        'numeric_precision_radix': None,
-                        'numeric_scale': None,
-                        'datetime_precision': None,
-                        'interval_type': None,
-                        'interval_precision': None,
-                        'character_set_catalog': None,
-                        'character_set_schema': None,
-                        'character_set_name': None,
-                        'collation_catalog': None,
-                        'collation_schema': None,
-                        'collation_name': None,
-                        'domain_catalog': None,
-                        'domain_schema': None,
-                        'domain_name': None,
-                        'udt_catalog': None,
-                        'udt_schema': None,
-                        'udt_name': None,
-                        'scope_catalog': None,
-                        'scope_schema': None,
-                        'scope_name': None,
-                        'maximum_cardinality': None,
-                        'dtd_identifier': None,
-                        'is_self_referencing': 'NO',
-                        'is_identity': 'NO',
-                        'identity_generation': None,
-                        'identity_start': None,
-                        'identity_increment': None,
-                        'identity_maximum': None,
-                        'identity_minimum': None,
-                        'identity_cycle': 'NO',
-                        'is_generated': 'NEVER',
-                        'generation_expression': None,
-                        'is_updatable': 'NO'
-                    })
-        
-        return rows
+                    row = _COLUMN_ROW_TEMPLATE.copy()
+                    row['table_schema'] = schema_name
+                    row['table_name'] = table_name
+                    row['column_name'] = col.name
+                    row['ordinal_position'] = idx + 1
+                    row['is_nullable'] = 'YES' if col.is_nullable else 'NO'
+                    row['data_type'] = col.data_type
+                    rows.append(row)
+        
+        return tuple(rows)
 
 
 
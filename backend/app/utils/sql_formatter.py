@@ -5,6 +5,41 @@ import re
 from typing import Optional
 
 
+# Keywords that should start on a new line
+_NEWLINE_KEYWORDS = [
+    'SELECT', 'FROM', 'WHERE', 'GROUP BY', 'HAVING', 
+    'ORDER BY', 'LIMIT', 'OFFSET', 'UNION', 'UNION ALL',
+    'JOIN', 'LEFT JOIN', 'RIGHT JOIN', 'INNER JOIN', 'OUTER JOIN',
+    'ON', 'AND', 'OR', 'WITH', 'AS'
+]
+
+
+def _keyword_pattern(keywords: list) -> re.Pattern:
+    """Compile one pattern matching any of the keywords as whole words."""
+    # Longest first, so 'LEFT JOIN' wins over 'JOIN'
+    alternation = '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf'\b({alternation})\b', re.IGNORECASE)
+
+
+_KEYWORD_RE = _keyword_pattern(_NEWLINE_KEYWORDS)
+# Queries starting with SELECT keep their SELECTs inline
+_KEYWORD_NO_SELECT_RE = _keyword_pattern([k for k in _NEWLINE_KEYWORDS if k != 'SELECT'])
+_MULTI_NEWLINE_RE = re.compile(r'\n\s*\n')
+
+
+# Table references: backtick-quoted, double-quoted or unquoted names
+_FROM_RE = re.compile(r'FROM\s+(?:`([^`]+)`|"([^"]+)"|(\S+))', re.IGNORECASE)
+_JOIN_RE = re.compile(
+    r'(?:LEFT|RIGHT|INNER|OUTER|CROSS|FULL)?\s*JOIN\s+(?:`([^`]+)`|"([^"]+)"|(\S+))',
+    re.IGNORECASE
+)
+_AGGREGATE_RE = re.compile(r'\b(?:COUNT|SUM|AVG|MAX|MIN|GROUP_CONCAT)\s*\(', re.IGNORECASE)
+
+
+def _newline_before_keyword(match: re.Match) -> str:
+    return '\n' + match.group(1).upper()
+
+
 def format_sql(sql: str) -> str:
     """
     Format SQL for better readability by adding line breaks
@@ -18,34 +53,24 @@ def format_sql(sql: str) -> str:
     if not sql:
         return sql
     
-    # Keywords that should start on a new line
-    keywords = [
-        'SELECT', 'FROM', 'WHERE', 'GROUP BY', 'HAVING', 
-        'ORDER BY', 'LIMIT', 'OFFSET', 'UNION', 'UNION ALL',
-        'JOIN', 'LEFT JOIN', 'RIGHT JOIN', 'INNER JOIN', 'OUTER JOIN',
-        'ON', 'AND', 'OR', 'WITH', 'AS'
-    ]
-    
     # First, normalize spaces
     sql = ' '.join(sql.split())
     
-    # Add line breaks before major keywords
-    for keyword in keywords:
-        # Use regex to match whole words only
-        pattern = rf'\b{keyword}\b'
-        
-        # Special handling for SELECT (don't add newline before first SELECT)
-        if keyword == 'SELECT' and sql.strip().upper().startswith('SELECT'):
-            continue
-            
-        # Add newline before keyword if it's not at the start
-        sql = re.sub(pattern, f'\n{keyword}', sql, flags=re.IGNORECASE)
+    # Add line breaks before major keywords, in a single pass
+    # (don't add a newline before the first SELECT)
+    keyword_re = _KEYWORD_NO_SELECT_RE if sql[:6].upper() == 'SELECT' else _KEYWORD_RE
+    sql = keyword_re.sub(_newline_before_keyword, sql)
     
     # Clean up multiple newlines
-    sql = re.sub(r'\n\s*\n', '\n', sql)
+    sql = _MULTI_NEWLINE_RE.sub('\n', sql)
     
     # Ensure proper indentation for readability
     lines = sql.strip().split('\n')
+    
+    # Without parentheses every line stays at the left margin
+    if '(' not in sql and ')' not in sql:
+        return '\n'.join(stripped for stripped in map(str.strip, lines) if stripped)
+    
     formatted_lines = []
     indent_level = 0
     
@@ -53,18 +78,22 @@ def format_sql(sql: str) -> str:
         line = line.strip()
         if not line:
             continue
-            
+        
+        # Each line is checked once for each parenthesis
+        opens = '(' in line
+        closes = ')' in line
+        
         # Decrease indent for closing parentheses
-        if line.startswith(')'):
+        if closes and line[0] == ')':
             indent_level = max(0, indent_level - 1)
         
         # Add indentation
         formatted_lines.append('  ' * indent_level + line)
         
         # Increase indent for subqueries
-        if '(' in line and not ')' in line:
+        if opens and not closes:
             indent_level += 1
-        elif ')' in line and not '(' in line:
+        elif closes and not opens:
             indent_level = max(0, indent_level - 1)
     
     return '\n'.join(formatted_lines)
@@ -89,31 +118,25 @@ def extract_table_info(sql: str) -> dict:
     
     # Extract main table from FROM clause
     # Match backtick-quoted or unquoted table names
-    from_pattern = r'FROM\s+(?:`([^`]+)`|"([^"]+)"|(\S+))'
-    from_match = re.search(from_pattern, sql, re.IGNORECASE)
+    from_match = _FROM_RE.search(sql)
     if from_match:
         # Get the first non-None group
         info['main_table'] = from_match.group(1) or from_match.group(2) or from_match.group(3)
         info['tables'].append(info['main_table'])
     
     # Check for JOINs
-    join_pattern = r'(?:LEFT|RIGHT|INNER|OUTER|CROSS|FULL)?\s*JOIN\s+(?:`([^`]+)`|"([^"]+)"|(\S+))'
-    join_matches = re.finditer(join_pattern, sql, re.IGNORECASE)
-    for match in join_matches:
+    for match in _JOIN_RE.finditer(sql):
         info['has_joins'] = True
         table_name = match.group(1) or match.group(2) or match.group(3)
         if table_name:
             info['tables'].append(table_name)
     
     # Check for aggregation functions
-    agg_functions = ['COUNT', 'SUM', 'AVG', 'MAX', 'MIN', 'GROUP_CONCAT']
-    for func in agg_functions:
-        if re.search(rf'\b{func}\s*\(', sql, re.IGNORECASE):
-            info['has_aggregation'] = True
-            break
-    
-    # Remove duplicates from tables
-    info['tables'] = list(set(info['tables']))
+    if _AGGREGATE_RE.search(sql):
+        info['has_aggregation'] = True
+    
+    # Remove duplicates from tables, keeping first-seen order
+    info['tables'] = list(dict.fromkeys(info['tables']))
     
     return info
 
@@ -10,20 +10,39 @@ This job runs every 15 minutes to:
 Deploy this as a Databricks Job with:
 - Cluster: Single node with Databricks Runtime
 - Schedule: Every 15 minutes
-- Libraries: databricks-sdk, pyyaml, structlog
+- Libraries: databricks-sdk, pyyaml, structlog (orjson optional, for faster result encoding)
 """
 
 import os
+import re
 import json
 import time
+import random
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 
 import structlog
+import yaml
 from databricks.sdk import WorkspaceClient
 from databricks.sdk.service.sql import ExecuteStatementResponse
 from pyspark.sql import SparkSession
+from pyspark.sql.types import (
+    LongType, StringType, StructField, StructType
+)
+
+# libyaml's C loader parses several times faster; it is optional in PyYAML
+try:
+    from yaml import CSafeLoader as _YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as _YAMLLoader
+
+# orjson encodes large result sets many times faster than the json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configure logging for Databricks
 structlog.configure(
@@ -33,6 +52,68 @@ structlog.configure(
 )
 logger = structlog.get_logger(__name__)
 
+# Refresh/TTL intervals such as '15m', '1h' or '2d'
+_INTERVAL_RE = re.compile(r'(\d+)([smhd])')
+_INTERVAL_UNITS = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days'}
+
+# Columns of the combined get_cache_stats query, split back into its two
+# result dicts
+CACHE_STATS_COLUMNS = (
+    'total_entries', 'total_hits', 'avg_hits_per_entry', 'active_entries', 'total_cache_size_bytes'
+)
+RECENT_PERF_COLUMNS = (
+    'total_requests', 'cache_hits', 'avg_execution_time_ms', 'avg_result_size_bytes'
+)
+
+# Metric queries run concurrently on the warehouse; the driver only waits
+REFRESH_WORKERS = 16
+
+# Tables created by MetricCacheManager._ensure_cache_tables
+CACHE_TABLES = (
+    'semantic_layer.cache.query_results',
+    'semantic_layer.cache.performance_metrics',
+)
+
+# Concurrent metric file downloads from a Volume
+VOLUME_DOWNLOAD_WORKERS = 16
+
+# Re-cluster the cache table about once an hour. Slightly under an hour, so
+# a run starting a little early on the 15-minute schedule still qualifies.
+OPTIMIZE_MIN_INTERVAL = timedelta(minutes=50)
+
+# One row per refreshed metric, staged for the batched cache MERGE and
+# performance_metrics INSERT
+REFRESHED_METRIC_SCHEMA = StructType([
+    StructField("cache_key", StringType(), False),
+    StructField("query_sql", StringType(), True),
+    StructField("result_data", StringType(), True),
+    StructField("ttl_seconds", LongType(), True),
+    StructField("metric_name", StringType(), True),
+    StructField("category", StringType(), True),
+    StructField("execution_time_ms", LongType(), True),
+    StructField("result_size_bytes", LongType(), True),
+])
+
+
+# Shared HTTP session, so alerts after the first reuse the webhook connection
+_slack_session = None
+
+
+def _get_slack_session():
+    """Get the shared Slack webhook session, importing requests on first use."""
+    global _slack_session
+    if _slack_session is None:
+        import requests
+        _slack_session = requests.Session()
+    return _slack_session
+
+
+def _encode_result(result_data: List[Dict[str, Any]]) -> bytes:
+    """Encode query result rows as UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(result_data)
+    return json.dumps(result_data).encode('utf-8')
+
 
 class MetricCacheManager:
     """Manage metric caching and pre-aggregation in Databricks."""
@@ -48,6 +129,11 @@ class MetricCacheManager:
     def _ensure_cache_tables(self):
         """Ensure the cache tables exist in Unity Catalog."""
         try:
+            # Catalog lookups are cheaper than the DDL, which is only needed
+            # on the first run against a workspace
+            if all(self.spark.catalog.tableExists(table) for table in CACHE_TABLES):
+                return
+            
             # Create schema if not exists
             self.spark.sql("""
                 CREATE SCHEMA IF NOT EXISTS semantic_layer.cache
@@ -98,24 +184,37 @@ class MetricCacheManager:
             
             # List YAML files in volume
             files = self.client.files.list_directory_contents(directory_path=volume_path)
+            yaml_files = [
+                file_info for file_info in files
+                if file_info.name.endswith('.yml') or file_info.name.endswith('.yaml')
+            ]
             metrics = []
             
-            for file_info in files:
-                if file_info.name.endswith('.yml') or file_info.name.endswith('.yaml'):
-                    try:
-                        # Download and parse YAML
-                        file_content = self.client.files.download(
-                            file_path=f"{volume_path}/{file_info.name}"
-                        )
-                        
-                        import yaml
-                        metric_data = yaml.safe_load(file_content.contents.decode('utf-8'))
-                        metric_data['file_name'] = file_info.name
-                        metric_data['category'] = category
-                        metrics.append(metric_data)
-                        
-                    except Exception as e:
-                        logger.warning(f"Failed to load metric {file_info.name}: {e}")
+            def download(file_info):
+                try:
+                    return self.client.files.download(
+                        file_path=f"{volume_path}/{file_info.name}"
+                    ), None
+                except Exception as e:
+                    return None, e
+            
+            # Download concurrently, then parse in listing order
+            with ThreadPoolExecutor(max_workers=max(1, min(len(yaml_files), VOLUME_DOWNLOAD_WORKERS))) as executor:
+                downloads = list(executor.map(download, yaml_files))
+            
+            for file_info, (file_content, error) in zip(yaml_files, downloads):
+                try:
+                    if error is not None:
+                        raise error
+                    
+                    # Parse YAML; bytes go straight to the parser
+                    metric_data = yaml.load(file_content.contents, Loader=_YAMLLoader)
+                    metric_data['file_name'] = file_info.name
+                    metric_data['category'] = category
+                    metrics.append(metric_data)
+                    
+                except Exception as e:
+                    logger.warning(f"Failed to load metric {file_info.name}: {e}")
             
             logger.info(f"Loaded {len(metrics)} metrics from {category}")
             return metrics
@@ -124,8 +223,34 @@ class MetricCacheManager:
             logger.error(f"Failed to load metrics from volume {category}: {e}")
             return []
     
-    def _should_refresh_metric(self, metric: Dict[str, Any]) -> bool:
-        """Determine if a metric should be refreshed based on cache config."""
+    def _load_last_refresh_map(self) -> Optional[Dict[str, datetime]]:
+        """Load when each cached metric was last refreshed, keyed by cache key.
+        
+        Returns None if the cache table could not be read.
+        """
+        try:
+            rows = self.spark.sql("""
+                SELECT cache_key, MAX(created_at) as last_refresh
+                FROM semantic_layer.cache.query_results 
+                GROUP BY cache_key
+            """).collect()
+            return {row['cache_key']: row['last_refresh'] for row in rows}
+            
+        except Exception as e:
+            logger.warning(f"Failed to load cache refresh times: {e}")
+            return None
+    
+    def _should_refresh_metric(
+        self,
+        metric: Dict[str, Any],
+        last_refresh_map: Optional[Dict[str, datetime]],
+        now: Optional[datetime] = None
+    ) -> bool:
+        """Determine if a metric should be refreshed based on cache config.
+        
+        now is the job's reference time, so every metric is judged against
+        the same instant.
+        """
         cache_config = metric.get('cache_config')
         if not cache_config:
             return False
@@ -133,16 +258,16 @@ class MetricCacheManager:
         if not cache_config.get('pre_aggregate', False):
             return False
         
+        # Refresh everything when the refresh times are unknown
+        if last_refresh_map is None:
+            return True
+        
         # Check when metric was last refreshed
         metric_name = metric.get('name', 'unknown')
         cache_key = self._generate_cache_key(metric_name, metric.get('definition', {}).get('sql', ''))
         
         try:
-            last_refresh = self.spark.sql(f"""
-                SELECT MAX(created_at) as last_refresh
-                FROM semantic_layer.cache.query_results 
-                WHERE cache_key = '{cache_key}'
-            """).collect()[0]['last_refresh']
+            last_refresh = last_refresh_map.get(cache_key)
             
             if not last_refresh:
                 return True
@@ -151,7 +276,7 @@ class MetricCacheManager:
             refresh_freq = cache_config.get('refresh_frequency', '15m')
             refresh_interval = self._parse_time_interval(refresh_freq)
             
-            return datetime.now() - last_refresh > refresh_interval
+            return (now or datetime.now()) - last_refresh > refresh_interval
             
         except Exception as e:
             logger.warning(f"Failed to check refresh status for {metric_name}: {e}")
@@ -159,29 +284,414 @@ class MetricCacheManager:
     
     def _parse_time_interval(self, interval_str: str) -> timedelta:
         """Parse time interval string (e.g., '15m', '1h', '2d') to timedelta."""
-        import re
-        
-        match = re.match(r'(\d+)([smhd])', interval_str.lower())
+        match = _INTERVAL_RE.match(interval_str.lower())
         if not match:
             return timedelta(minutes=15)  # default
         
         value, unit = match.groups()
-        value = int(value)
-        
-        if unit == 's':
-            return timedelta(seconds=value)
-        elif unit == 'm':
-            return timedelta(minutes=value)
-        elif unit == 'h':
-            return timedelta(hours=value)
-        elif unit == 'd':
-            return timedelta(days=value)
-        
-        return timedelta(minutes=15)
+        return timedelta(**{_INTERVAL_UNITS[unit]: int(value)})
     
     def _generate_cache_key(self, metric_name: str, sql: str) -> str:
         """Generate consistent cache key for metric."""
         content = f"{metric_name}:{sql}"
         return hashlib.md5(content.encode()).hexdigest()
     
-    def _execute_sql_with_retry(self, sql: str, max_retries: int = 3) -> Optional[List[Dict[str, Any]]]:\n        \"\"\"Execute SQL with retry logic.\"\"\"\n        for attempt in range(max_retries):\n            try:\n                result = self.spark.sql(sql)\n                return [row.asDict() for row in result.collect()]\n                \n            except Exception as e:\n                logger.warning(f\"SQL execution attempt {attempt + 1} failed: {e}\")\n                if attempt == max_retries - 1:\n                    raise\n                time.sleep(2 ** attempt)  # exponential backoff\n        \n        return None\n    \n    def refresh_metric_cache(self, metric: Dict[str, Any]) -> bool:\n        \"\"\"Refresh cache for a specific metric.\"\"\"\n        try:\n            metric_name = metric.get('name', 'unknown')\n            definition = metric.get('definition', {})\n            sql = definition.get('sql')\n            \n            if not sql:\n                logger.warning(f\"No SQL found for metric {metric_name}\")\n                return False\n            \n            logger.info(f\"Refreshing cache for metric {metric_name}\")\n            \n            # Execute the metric query\n            start_time = time.time()\n            result_data = self._execute_sql_with_retry(sql)\n            execution_time_ms = int((time.time() - start_time) * 1000)\n            \n            if result_data is None:\n                logger.error(f\"Failed to execute query for metric {metric_name}\")\n                return False\n            \n            # Store in cache\n            cache_key = self._generate_cache_key(metric_name, sql)\n            result_json = json.dumps(result_data)\n            result_size = len(result_json.encode('utf-8'))\n            \n            # Determine TTL from cache config\n            cache_config = metric.get('cache_config', {})\n            ttl = cache_config.get('ttl', '1h')\n            ttl_interval = self._parse_time_interval(ttl)\n            expires_at = datetime.now() + ttl_interval\n            \n            # Insert/update cache entry\n            self.spark.sql(f\"\"\"\n                MERGE INTO semantic_layer.cache.query_results t\n                USING (SELECT \n                    '{cache_key}' as cache_key,\n                    '''{sql.replace(\"'\", \"''\")}''' as query_sql,\n                    '''{result_json.replace(\"'\", \"''\")}''' as result_data,\n                    current_timestamp() as created_at,\n                    timestamp '{expires_at.strftime(\"%Y-%m-%d %H:%M:%S\")}' as expires_at,\n                    CAST(1 as BIGINT) as hit_count,\n                    current_timestamp() as last_accessed,\n                    '{metric_name}' as metric_name,\n                    '{metric.get('category', 'unknown')}' as category\n                ) s\n                ON t.cache_key = s.cache_key\n                WHEN MATCHED THEN UPDATE SET\n                    result_data = s.result_data,\n                    created_at = s.created_at,\n                    expires_at = s.expires_at,\n                    last_accessed = s.last_accessed\n                WHEN NOT MATCHED THEN INSERT *\n            \"\"\")\n            \n            # Log performance metrics\n            self.spark.sql(f\"\"\"\n                INSERT INTO semantic_layer.cache.performance_metrics\n                VALUES (\n                    current_timestamp(),\n                    '{metric_name}',\n                    '{cache_key}',\n                    false,  -- This is a refresh, not a hit\n                    {execution_time_ms},\n                    {result_size},\n                    'system_cache_refresh'\n                )\n            \"\"\")\n            \n            logger.info(\n                f\"Successfully refreshed cache for {metric_name}\",\n                execution_time_ms=execution_time_ms,\n                result_size_bytes=result_size\n            )\n            \n            return True\n            \n        except Exception as e:\n            logger.error(f\"Failed to refresh cache for metric {metric_name}: {e}\")\n            return False\n    \n    def cleanup_expired_cache(self):\n        \"\"\"Remove expired cache entries.\"\"\"\n        try:\n            result = self.spark.sql(\"\"\"\n                DELETE FROM semantic_layer.cache.query_results \n                WHERE expires_at < current_timestamp()\n            \"\"\")\n            \n            logger.info(\"Cleaned up expired cache entries\")\n            \n        except Exception as e:\n            logger.error(f\"Failed to cleanup expired cache: {e}\")\n    \n    def get_cache_stats(self) -> Dict[str, Any]:\n        \"\"\"Get cache performance statistics.\"\"\"\n        try:\n            # Overall cache stats\n            stats = self.spark.sql(\"\"\"\n                SELECT \n                    COUNT(*) as total_entries,\n                    SUM(hit_count) as total_hits,\n                    AVG(hit_count) as avg_hits_per_entry,\n                    COUNT(CASE WHEN expires_at > current_timestamp() THEN 1 END) as active_entries,\n                    SUM(LENGTH(result_data)) as total_cache_size_bytes\n                FROM semantic_layer.cache.query_results\n            \"\"\").collect()[0].asDict()\n            \n            # Recent performance (last hour)\n            recent_perf = self.spark.sql(\"\"\"\n                SELECT \n                    COUNT(*) as total_requests,\n                    SUM(CASE WHEN hit THEN 1 ELSE 0 END) as cache_hits,\n                    AVG(execution_time_ms) as avg_execution_time_ms,\n                    AVG(result_size_bytes) as avg_result_size_bytes\n                FROM semantic_layer.cache.performance_metrics\n                WHERE timestamp > current_timestamp() - INTERVAL 1 HOUR\n            \"\"\").collect()[0].asDict()\n            \n            # Calculate hit rate\n            hit_rate = 0.0\n            if recent_perf['total_requests'] and recent_perf['total_requests'] > 0:\n                hit_rate = recent_perf['cache_hits'] / recent_perf['total_requests']\n            \n            return {\n                'timestamp': datetime.now().isoformat(),\n                'cache_stats': stats,\n                'recent_performance': recent_perf,\n                'hit_rate': hit_rate\n            }\n            \n        except Exception as e:\n            logger.error(f\"Failed to get cache stats: {e}\")\n            return {}\n    \n    def send_slack_alert(self, message: str, severity: str = \"info\"):\n        \"\"\"Send Slack alert (simplified - use webhook URL from environment).\"\"\"\n        try:\n            import requests\n            \n            webhook_url = os.getenv('SLACK_WEBHOOK_URL')\n            if not webhook_url:\n                logger.info(f\"Slack alert (no webhook configured): {message}\")\n                return\n            \n            color_map = {\n                \"info\": \"#36a64f\",\n                \"warning\": \"#ff9500\", \n                \"error\": \"#ff0000\",\n                \"critical\": \"#ff0000\"\n            }\n            \n            payload = {\n                \"attachments\": [{\n                    \"color\": color_map.get(severity, \"#36a64f\"),\n                    \"text\": message,\n                    \"ts\": time.time()\n                }]\n            }\n            \n            response = requests.post(webhook_url, json=payload, timeout=10)\n            response.raise_for_status()\n            \n            logger.info(f\"Sent Slack alert: {message}\")\n            \n        except Exception as e:\n            logger.warning(f\"Failed to send Slack alert: {e}\")\n\n\ndef main():\n    \"\"\"Main job execution.\"\"\"\n    logger.info(\"Starting cache refresh job\")\n    \n    try:\n        cache_manager = MetricCacheManager()\n        \n        # Load metrics that need refreshing\n        all_metrics = []\n        for category in [\"production_models\", \"staging_models\"]:\n            metrics = cache_manager._load_metrics_from_volume(category)\n            all_metrics.extend(metrics)\n        \n        # Filter metrics that need refreshing\n        metrics_to_refresh = [m for m in all_metrics if cache_manager._should_refresh_metric(m)]\n        \n        logger.info(f\"Found {len(metrics_to_refresh)} metrics to refresh\")\n        \n        # Refresh each metric\n        successful_refreshes = 0\n        failed_refreshes = 0\n        \n        for metric in metrics_to_refresh:\n            try:\n                if cache_manager.refresh_metric_cache(metric):\n                    successful_refreshes += 1\n                else:\n                    failed_refreshes += 1\n            except Exception as e:\n                logger.error(f\"Failed to refresh metric {metric.get('name', 'unknown')}: {e}\")\n                failed_refreshes += 1\n        \n        # Cleanup expired cache\n        cache_manager.cleanup_expired_cache()\n        \n        # Get performance stats\n        stats = cache_manager.get_cache_stats()\n        hit_rate = stats.get('hit_rate', 0.0)\n        \n        # Send alerts if needed\n        if hit_rate < 0.7:  # Less than 70% hit rate\n            cache_manager.send_slack_alert(\n                f\"🚨 Cache hit rate dropped to {hit_rate:.1%}. Consider reviewing cache configuration.\",\n                \"warning\"\n            )\n        \n        if failed_refreshes > 0:\n            cache_manager.send_slack_alert(\n                f\"⚠️ {failed_refreshes} metric cache refreshes failed. Check job logs for details.\",\n                \"warning\"\n            )\n        \n        # Success summary\n        summary_msg = f\"✅ Cache refresh completed: {successful_refreshes} successful, {failed_refreshes} failed. Hit rate: {hit_rate:.1%}\"\n        logger.info(summary_msg)\n        \n        if successful_refreshes > 0:\n            cache_manager.send_slack_alert(summary_msg, \"info\")\n        \n        logger.info(\"Cache refresh job completed successfully\")\n        \n    except Exception as e:\n        error_msg = f\"❌ Cache refresh job failed: {str(e)}\"\n        logger.error(error_msg)\n        \n        try:\n            cache_manager = MetricCacheManager()\n            cache_manager.send_slack_alert(error_msg, \"critical\")\n        except:\n            pass  # Don't fail the job if Slack alert fails\n        \n        raise\n\n\nif __name__ == \"__main__\":\n    main()
\ No newline at end of file
+    def _execute_sql_with_retry(self, sql: str, max_retries: int = 3) -> Optional[List[Dict[str, Any]]]:
+        """Execute SQL with retry logic."""
+        for attempt in range(max_retries):
+            try:
+                result = self.spark.sql(sql)
+                return [row.asDict() for row in result.collect()]
+                
+            except Exception as e:
+                logger.warning(f"SQL execution attempt {attempt + 1} failed: {e}")
+                if attempt == max_retries - 1:
+                    raise
+                # Capped exponential backoff with full jitter, so concurrent
+                # refreshes failing together do not retry in lockstep
+                time.sleep(random.uniform(0, min(30, 2 ** attempt)))
+        
+        return None
+    
+    def refresh_metric_cache(self, metric: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Run a metric's query and return its cache row for store_refreshed_metrics.
+        
+        The row carries the TTL in seconds; expires_at is set when it is written.
+        Returns None if the metric has no SQL or its query failed.
+        """
+        try:
+            metric_name = metric.get('name', 'unknown')
+            definition = metric.get('definition', {})
+            sql = definition.get('sql')
+            
+            if not sql:
+                logger.warning(f"No SQL found for metric {metric_name}")
+                return None
+            
+            logger.info(f"Refreshing cache for metric {metric_name}")
+            
+            # Execute the metric query
+            start_time = time.time()
+            result_data = self._execute_sql_with_retry(sql)
+            execution_time_ms = int((time.time() - start_time) * 1000)
+            
+            if result_data is None:
+                logger.error(f"Failed to execute query for metric {metric_name}")
+                return None
+            
+            # Store in cache
+            cache_key = self._generate_cache_key(metric_name, sql)
+            result_bytes = _encode_result(result_data)
+            result_size = len(result_bytes)
+            result_json = result_bytes.decode('utf-8')
+            
+            # Determine TTL from cache config
+            cache_config = metric.get('cache_config', {})
+            ttl = cache_config.get('ttl', '1h')
+            ttl_seconds = int(self._parse_time_interval(ttl).total_seconds())
+            
+            logger.info(
+                f"Successfully refreshed cache for {metric_name}",
+                execution_time_ms=execution_time_ms,
+                result_size_bytes=result_size
+            )
+            
+            return {
+                'cache_key': cache_key,
+                'query_sql': sql,
+                'result_data': result_json,
+                'ttl_seconds': ttl_seconds,
+                'metric_name': metric_name,
+                'category': metric.get('category', 'unknown'),
+                'execution_time_ms': execution_time_ms,
+                'result_size_bytes': result_size
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to refresh cache for metric {metric_name}: {e}")
+            return None
+    
+    def store_refreshed_metrics(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write refreshed metric rows to the cache, batched where possible.
+        
+        If the batched write fails, each row is written on its own so one bad
+        row does not discard the rest of the run.
+        
+        Returns the rows that could not be stored.
+        """
+        if not rows:
+            return []
+        
+        try:
+            self._write_refreshed_metrics(rows)
+            return []
+        except Exception as e:
+            logger.warning(f"Batched cache write failed, retrying per metric: {e}")
+        
+        failed_rows = []
+        for row in rows:
+            try:
+                self._write_refreshed_metrics([row])
+            except Exception as e:
+                logger.error(f"Failed to store cache for metric {row['metric_name']}: {e}")
+                failed_rows.append(row)
+        return failed_rows
+    
+    def _write_refreshed_metrics(self, rows: List[Dict[str, Any]]):
+        """Write refreshed metric rows to the cache with one MERGE and one INSERT."""
+        # MERGE needs one source row per key; a key refreshed twice keeps its
+        # first row's identity and its last result, as consecutive MERGEs would
+        merge_rows: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            staged = merge_rows.get(row['cache_key'])
+            if staged is None:
+                merge_rows[row['cache_key']] = dict(row)
+            else:
+                staged['result_data'] = row['result_data']
+                staged['ttl_seconds'] = row['ttl_seconds']
+        
+        self.spark.createDataFrame(
+            list(merge_rows.values()), REFRESHED_METRIC_SCHEMA
+        ).createOrReplaceTempView("refreshed_metrics")
+        self.spark.createDataFrame(
+            rows, REFRESHED_METRIC_SCHEMA
+        ).createOrReplaceTempView("refreshed_metric_runs")
+        
+        # Insert/update cache entries
+        self.spark.sql("""
+            MERGE INTO semantic_layer.cache.query_results t
+            USING (
+                SELECT
+                    cache_key,
+                    query_sql,
+                    result_data,
+                    current_timestamp() as created_at,
+                    -- TTL runs from the write, not from the start of the job
+                    timestampadd(SECOND, ttl_seconds, current_timestamp()) as expires_at,
+                    CAST(1 as BIGINT) as hit_count,
+                    current_timestamp() as last_accessed,
+                    metric_name,
+                    category
+                FROM refreshed_metrics
+            ) s
+            ON t.cache_key = s.cache_key
+            WHEN MATCHED THEN UPDATE SET
+                result_data = s.result_data,
+                created_at = s.created_at,
+                expires_at = s.expires_at,
+                last_accessed = s.last_accessed
+            WHEN NOT MATCHED THEN INSERT *
+        """)
+        
+        # Log performance metrics, one row per refresh
+        self.spark.sql("""
+            INSERT INTO semantic_layer.cache.performance_metrics
+            SELECT
+                current_timestamp(),
+                metric_name,
+                cache_key,
+                false,  -- This is a refresh, not a hit
+                execution_time_ms,
+                result_size_bytes,
+                'system_cache_refresh'
+            FROM refreshed_metric_runs
+        """)
+        
+        logger.info(f"Stored {len(merge_rows)} refreshed cache entries")
+    
+    def cleanup_expired_cache(self):
+        """Remove expired cache entries."""
+        try:
+            result = self.spark.sql("""
+                DELETE FROM semantic_layer.cache.query_results 
+                WHERE expires_at < current_timestamp()
+            """)
+            
+            logger.info("Cleaned up expired cache entries")
+            
+        except Exception as e:
+            logger.error(f"Failed to cleanup expired cache: {e}")
+    
+    def _last_optimize_time(self) -> Optional[datetime]:
+        """Find when the cache table was last optimized, from its Delta history.
+        
+        Returns None if it never was, or the history could not be read.
+        """
+        try:
+            rows = self.spark.sql(
+                "DESCRIBE HISTORY semantic_layer.cache.query_results"
+            ).where("operation = 'OPTIMIZE'").select("timestamp").orderBy(
+                "timestamp", ascending=False
+            ).limit(1).collect()
+            return rows[0]['timestamp'] if rows else None
+            
+        except Exception as e:
+            logger.warning(f"Failed to read cache table history: {e}")
+            return None
+    
+    def optimize_cache_table(self):
+        """Compact the cache table and cluster it by cache key.
+        
+        The MERGE on cache_key can then skip files instead of reading every
+        small file the frequent writes leave behind. The refresh-time scan
+        reads the whole table, so it only gains from the compaction.
+        """
+        try:
+            self.spark.sql("""
+                OPTIMIZE semantic_layer.cache.query_results
+                ZORDER BY (cache_key)
+            """)
+            
+            logger.info("Optimized cache table")
+            
+        except Exception as e:
+            logger.error(f"Failed to optimize cache table: {e}")
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get cache performance statistics."""
+        try:
+            # Overall cache stats and recent performance (last hour), in
+            # one query
+            row = self.spark.sql("""
+                WITH cache_stats AS (
+                    SELECT 
+                        COUNT(*) as total_entries,
+                        SUM(hit_count) as total_hits,
+                        AVG(hit_count) as avg_hits_per_entry,
+                        COUNT(CASE WHEN expires_at > current_timestamp() THEN 1 END) as active_entries,
+                        SUM(LENGTH(result_data)) as total_cache_size_bytes
+                    FROM semantic_layer.cache.query_results
+                ),
+                recent_perf AS (
+                    SELECT 
+                        COUNT(*) as total_requests,
+                        SUM(CASE WHEN hit THEN 1 ELSE 0 END) as cache_hits,
+                        AVG(execution_time_ms) as avg_execution_time_ms,
+                        AVG(result_size_bytes) as avg_result_size_bytes
+                    FROM semantic_layer.cache.performance_metrics
+                    WHERE timestamp > current_timestamp() - INTERVAL 1 HOUR
+                )
+                SELECT * FROM cache_stats CROSS JOIN recent_perf
+            """).collect()[0].asDict()
+            
+            stats = {key: row[key] for key in CACHE_STATS_COLUMNS}
+            recent_perf = {key: row[key] for key in RECENT_PERF_COLUMNS}
+            
+            # Calculate hit rate
+            hit_rate = 0.0
+            if recent_perf['total_requests'] and recent_perf['total_requests'] > 0:
+                hit_rate = recent_perf['cache_hits'] / recent_perf['total_requests']
+            
+            return {
+                'timestamp': datetime.now().isoformat(),
+                'cache_stats': stats,
+                'recent_performance': recent_perf,
+                'hit_rate': hit_rate
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to get cache stats: {e}")
+            return {}
+    
+    @staticmethod
+    def send_slack_alert(message: str, severity: str = "info"):
+        """Send Slack alert (simplified - use webhook URL from environment).
+        
+        Needs no manager state, so it also works when the manager itself
+        could not be created.
+        """
+        try:
+            webhook_url = os.getenv('SLACK_WEBHOOK_URL')
+            if not webhook_url:
+                logger.info(f"Slack alert (no webhook configured): {message}")
+                return
+            
+            color_map = {
+                "info": "#36a64f",
+                "warning": "#ff9500", 
+                "error": "#ff0000",
+                "critical": "#ff0000"
+            }
+            
+            payload = {
+                "attachments": [{
+                    "color": color_map.get(severity, "#36a64f"),
+                    "text": message,
+                    "ts": time.time()
+                }]
+            }
+            
+            response = _get_slack_session().post(webhook_url, json=payload, timeout=10)
+            response.raise_for_status()
+            
+            logger.info(f"Sent Slack alert: {message}")
+            
+        except Exception as e:
+            logger.warning(f"Failed to send Slack alert: {e}")
+
+
+def main():
+    """Main job execution."""
+    logger.info("Starting cache refresh job")
+    
+    try:
+        cache_manager = MetricCacheManager()
+        
+        # Load metrics that need refreshing
+        all_metrics = []
+        for category in ["production_models", "staging_models"]:
+            metrics = cache_manager._load_metrics_from_volume(category)
+            all_metrics.extend(metrics)
+        
+        # One reference time for every staleness check in the run
+        now = datetime.now()
+        
+        # Filter metrics that need refreshing, against one scan of the cache
+        last_refresh_map = cache_manager._load_last_refresh_map()
+        metrics_to_refresh = [
+            m for m in all_metrics if cache_manager._should_refresh_metric(m, last_refresh_map, now=now)
+        ]
+        
+        logger.info(f"Found {len(metrics_to_refresh)} metrics to refresh")
+        
+        # Refresh each metric; the queries run concurrently
+        successful_refreshes = 0
+        failed_refreshes = 0
+        refreshed_rows = []
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(len(metrics_to_refresh), REFRESH_WORKERS))) as executor:
+            futures = [
+                executor.submit(cache_manager.refresh_metric_cache, metric)
+                for metric in metrics_to_refresh
+            ]
+        
+        # Collect in submission order, so batched writes stay deterministic
+        for metric, future in zip(metrics_to_refresh, futures):
+            try:
+                row = future.result()
+                if row is not None:
+                    refreshed_rows.append(row)
+                    successful_refreshes += 1
+                else:
+                    failed_refreshes += 1
+            except Exception as e:
+                logger.error(f"Failed to refresh metric {metric.get('name', 'unknown')}: {e}")
+                failed_refreshes += 1
+        
+        # Write all refreshed results in one batch; rows that cannot be
+        # stored count as failed refreshes
+        failed_rows = cache_manager.store_refreshed_metrics(refreshed_rows)
+        successful_refreshes -= len(failed_rows)
+        failed_refreshes += len(failed_rows)
+        
+        # Cleanup expired cache
+        cache_manager.cleanup_expired_cache()
+        
+        # Re-cluster the cache table about once an hour, judged from the last
+        # OPTIMIZE rather than the clock, so late or manual runs do not skip or
+        # repeat it
+        last_optimize = cache_manager._last_optimize_time()
+        if last_optimize is None or datetime.now() - last_optimize >= OPTIMIZE_MIN_INTERVAL:
+            cache_manager.optimize_cache_table()
+        
+        # Get performance stats
+        stats = cache_manager.get_cache_stats()
+        hit_rate = stats.get('hit_rate', 0.0)
+        
+        # Send alerts if needed
+        if hit_rate < 0.7:  # Less than 70% hit rate
+            cache_manager.send_slack_alert(
+                f"🚨 Cache hit rate dropped to {hit_rate:.1%}. Consider reviewing cache configuration.",
+                "warning"
+            )
+        
+        if failed_refreshes > 0:
+            cache_manager.send_slack_alert(
+                f"⚠️ {failed_refreshes} metric cache refreshes failed. Check job logs for details.",
+                "warning"
+            )
+        
+        # Success summary
+        summary_msg = f"✅ Cache refresh completed: {successful_refreshes} successful, {failed_refreshes} failed. Hit rate: {hit_rate:.1%}"
+        logger.info(summary_msg)
+        
+        if successful_refreshes > 0:
+            cache_manager.send_slack_alert(summary_msg, "info")
+        
+        logger.info("Cache refresh job completed successfully")
+        
+    except Exception as e:
+        error_msg = f"❌ Cache refresh job failed: {str(e)}"
+        logger.error(error_msg)
+        
+        # Alert without building a new manager (and re-running its setup)
+        try:
+            MetricCacheManager.send_slack_alert(error_msg, "critical")
+        except:
+            pass  # Don't fail the job if Slack alert fails
+        
+        raise
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
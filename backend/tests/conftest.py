@@ -1,7 +1,8 @@
 """Test configuration and fixtures for semantic layer service tests."""
 
+import copy
+
 import pytest
-import os
 from unittest.mock import Mock, patch
 from fastapi.testclient import TestClient
 from app.main import app
@@ -26,9 +27,9 @@ def mock_databricks_connection():
         yield mock_conn, mock_cursor
 
 
-@pytest.fixture
-def sample_table_metadata():
-    """Sample table metadata for testing."""
+@pytest.fixture(scope="session")
+def _sample_table_metadata():
+    """Sample table metadata for testing, built once per session."""
     return [
         {
             'catalog_name': 'main',
@@ -51,8 +52,14 @@ def sample_table_metadata():
 
 
 @pytest.fixture
-def sample_semantic_model():
-    """Sample semantic model definition for testing."""
+def sample_table_metadata(_sample_table_metadata):
+    """Sample table metadata for testing."""
+    return copy.deepcopy(_sample_table_metadata)
+
+
+@pytest.fixture(scope="session")
+def _sample_semantic_model():
+    """Sample semantic model definition for testing, built once per session."""
     return {
         'name': 'test_sales_metrics',
         'description': 'Test sales metrics model',
@@ -108,8 +115,14 @@ def sample_semantic_model():
 
 
 @pytest.fixture
-def mock_genie_response():
-    """Mock Databricks Genie API response."""
+def sample_semantic_model(_sample_semantic_model):
+    """Sample semantic model definition for testing."""
+    return copy.deepcopy(_sample_semantic_model)
+
+
+@pytest.fixture(scope="session")
+def _mock_genie_response():
+    """Mock Databricks Genie API response, built once per session."""
     return {
         'statement_id': 'test-statement-123',
         'status': {
@@ -133,9 +146,15 @@ def mock_genie_response():
     }
 
 
+@pytest.fixture
+def mock_genie_response(_mock_genie_response):
+    """Mock Databricks Genie API response."""
+    return copy.deepcopy(_mock_genie_response)
+
+
 @pytest.fixture(autouse=True)
-def setup_test_environment():
-    """Setup test environment variables."""
+def setup_test_environment(monkeypatch):
+    """Setup test environment variables (restored by monkeypatch after each test)."""
     test_env = {
         'DATABRICKS_HOST': 'test-workspace.databricks.com',
         'DATABRICKS_TOKEN': 'test-token',
@@ -143,5 +162,5 @@ def setup_test_environment():
         'DATABRICKS_GENIE_SPACE_ID': 'test-space-id'
     }
     
-    with patch.dict(os.environ, test_env):
-        yield
\ No newline at end of file
+    for key, value in test_env.items():
+        monkeypatch.setenv(key, value)
\ No newline at end of file
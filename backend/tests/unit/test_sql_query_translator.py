@@ -0,0 +1,169 @@
+"""
+Unit tests for the SQL API query translator.
+Tests cover clause extraction, translation and the translation caches.
+"""
+
+import pytest
+import yaml
+from sqlparse.sql import Where
+
+from app.sql_api.query_translator import SQLToSemanticTranslator, _parse_statement
+from app.sql_api.virtual_schema import VirtualSchemaManager
+
+
+SALES_MODEL = {
+    'name': 'sales',
+    'description': 'Sales model',
+    'model': "ref('main.gold.sales_fact')",
+    'entities': [{'name': 'customer_id', 'type': 'primary', 'expr': 'customer_id'}],
+    'dimensions': [
+        {'name': 'region', 'type': 'categorical', 'expr': 'region'},
+        {'name': 'order_date', 'type': 'time', 'expr': 'DATE(ordered_at)'},
+    ],
+    'measures': [{'name': 'revenue', 'agg': 'sum', 'expr': 'amount'}],
+    'metrics': [{'name': 'total_revenue', 'type': 'simple', 'measure': 'revenue'}],
+}
+
+
+def _write_model(models_path, model):
+    (models_path / f"{model['name']}.yml").write_text(yaml.safe_dump(model))
+
+
+@pytest.fixture
+def schema_manager(tmp_path):
+    """Schema manager loaded with SALES_MODEL from a temporary directory."""
+    _write_model(tmp_path, SALES_MODEL)
+    return VirtualSchemaManager(str(tmp_path))
+
+
+@pytest.fixture
+def translator(schema_manager):
+    """Translator over the sales schema."""
+    return SQLToSemanticTranslator(schema_manager)
+
+
+class TestStatementScan:
+    """Test clause extraction from SELECT statements"""
+
+    def _scan(self, translator, sql):
+        return translator._scan_statement(_parse_statement(sql))
+
+    def test_all_clauses(self, translator):
+        """Test SELECT, FROM, WHERE, GROUP BY, ORDER BY and LIMIT are all collected"""
+        parts = self._scan(
+            translator,
+            "SELECT region, sum(amount) FROM sem_sales.fact WHERE region = 'emea' "
+            "GROUP BY region, order_date ORDER BY region, order_date LIMIT 10"
+        )
+
+        assert parts.tables[0] == 'sem_sales.fact'
+        assert [str(item) for item in parts.select_list] == ['region', 'sum(amount)']
+        assert isinstance(parts.where, Where)
+        assert translator._extract_conditions(parts.where) == [('region', '=', 'emea')]
+        assert parts.group_by == ['region', 'order_date']
+        assert [column for column, _ in parts.order_by] == ['region', 'order_date']
+        assert parts.limit == 10
+
+    def test_single_group_and_order_column(self, translator):
+        """Test clauses holding one column rather than an identifier list"""
+        parts = self._scan(
+            translator,
+            "select region from fact group by region order by region limit 3"
+        )
+
+        assert parts.tables[0] == 'fact'
+        assert [str(item) for item in parts.select_list] == ['region']
+        assert parts.where is None
+        assert parts.group_by == ['region']
+        assert [column for column, _ in parts.order_by] == ['region']
+        assert parts.limit == 3
+
+    def test_missing_clauses(self, translator):
+        """Test a bare SELECT * leaves every optional clause empty"""
+        parts = self._scan(translator, "SELECT * FROM sem_sales.fact")
+
+        assert parts.tables == ['sem_sales.fact']
+        assert parts.select_list == []
+        assert parts.where is None
+        assert parts.group_by == []
+        assert parts.order_by == []
+        assert parts.limit is None
+
+
+class TestTranslation:
+    """Test SQL to semantic query translation"""
+
+    def test_translate_select(self, translator):
+        """Test dimensions, filters, ordering and limit are translated"""
+        result = translator.translate(
+            "SELECT region FROM sem_sales.fact WHERE region = 'emea' "
+            "GROUP BY region, order_date ORDER BY region LIMIT 10"
+        )
+
+        assert result == {
+            'model': 'sales',
+            'metrics': [],
+            'dimensions': ['region', 'order_date'],
+            'filters': {'region': 'emea'},
+            'order_by': [{'column': 'region', 'direction': 'asc'}],
+            'limit': 10,
+            'time_granularity': 'day',
+        }
+
+    def test_unknown_table(self, translator):
+        """Test a table outside the semantic schema is rejected"""
+        with pytest.raises(ValueError, match="Table not found"):
+            translator.translate("SELECT region FROM missing")
+
+    def test_non_select_statement(self, translator):
+        """Test statements other than SELECT are rejected"""
+        with pytest.raises(ValueError, match="Unsupported SQL statement type"):
+            translator.translate("UPDATE fact SET region = 'x'")
+
+
+class TestTranslationCache:
+    """Test memoization of translations and table references"""
+
+    def test_terminators_share_cache_entry(self, translator):
+        """Test trailing semicolons and whitespace reuse one cached translation"""
+        sql = "SELECT region FROM sem_sales.fact"
+
+        results = [translator.translate_bytes(variant) for variant in (sql, sql + ';', sql + ' ; ')]
+
+        assert results[0] == results[1] == results[2]
+        info = translator._translate_cached.cache_info()
+        assert (info.misses, info.hits, info.currsize) == (1, 2, 1)
+
+    def test_translate_returns_independent_copies(self, translator):
+        """Test callers can modify a translation without affecting the cache"""
+        sql = "SELECT region FROM sem_sales.fact"
+
+        translator.translate(sql)['dimensions'].append('changed')
+
+        assert translator.translate(sql)['dimensions'] == ['region']
+
+    def test_schema_reload_drops_cached_translations(self, translator, schema_manager, tmp_path):
+        """Test a model reload re-translates instead of serving the old result"""
+        sql = "SELECT region FROM sem_sales.fact"
+        assert translator.translate(sql)['dimensions'] == ['region']
+
+        # Same table and column names, but region is no longer a dimension
+        model = dict(SALES_MODEL, dimensions=[SALES_MODEL['dimensions'][1]])
+        _write_model(tmp_path, model)
+        version = schema_manager.version
+        schema_manager.reload_models()
+
+        assert schema_manager.version != version
+        assert translator.translate(sql)['dimensions'] == []
+        assert translator._translate_cached.cache_info().misses == 2
+
+    def test_resolve_memo_dropped_on_reload(self, schema_manager, tmp_path):
+        """Test resolved table references follow a model reload"""
+        table = schema_manager.resolve('fact')
+        assert table is schema_manager.resolve('fact')
+        assert schema_manager.resolve('missing') is None
+
+        (tmp_path / 'sales.yml').unlink()
+        schema_manager.reload_models()
+
+        assert schema_manager.resolve('fact') is None
@@ -0,0 +1,164 @@
+"""
+Unit tests for the PostgreSQL-compatible SQL server.
+Tests cover the bytes written for query responses and the result cache.
+"""
+
+import asyncio
+import struct
+
+import pytest
+import yaml
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.services.lineage_cache import LineageCache
+from app.sql_api.protocol import PostgreSQLProtocol
+from app.sql_api.query_translator import SQLToSemanticTranslator
+from app.sql_api.server import ClientConnection, SQLServer
+from app.sql_api.virtual_schema import VirtualSchemaManager
+
+
+SALES_MODEL = {
+    'name': 'sales',
+    'model': "ref('main.gold.sales_fact')",
+    'dimensions': [{'name': 'region', 'type': 'categorical', 'expr': 'region'}],
+    'measures': [{'name': 'revenue', 'agg': 'sum', 'expr': 'amount'}],
+}
+
+
+class FakeWriter:
+    """Stream writer collecting everything sent to the client."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.transport = Mock()
+        self.transport.get_write_buffer_size.return_value = 0
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+def _messages(data):
+    """Split backend messages into (type, body) pairs, checking their framing."""
+    messages = []
+    pos = 0
+    while pos < len(data):
+        msg_type = data[pos:pos + 1]
+        length = struct.unpack_from('!I', data, pos + 1)[0]
+        assert msg_type.isalpha() and length >= 4, f"malformed frame at byte {pos}"
+        messages.append((msg_type, bytes(data[pos + 5:pos + 1 + length])))
+        pos += 1 + length
+    assert pos == len(data)
+    return messages
+
+
+def _query(sql):
+    return sql.encode('utf-8') + b'\x00'
+
+
+@pytest.fixture
+def server():
+    """Server stand-in whose semantic parser returns canned rows."""
+    server = Mock()
+    server.protocol = PostgreSQLProtocol()
+    server.result_cache = None
+    server.query_translator.translate.return_value = {'model': 'sales'}
+    server.semantic_parser.execute_query = AsyncMock()
+    return server
+
+
+@pytest.fixture
+def connection(server):
+    """Client connection writing to a FakeWriter."""
+    conn = ClientConnection(conn_id='test', reader=Mock(), writer=FakeWriter(), server=server)
+    conn.username = 'analyst'
+    conn.database = 'semantic_layer'
+    return conn
+
+
+class TestSimpleQueryResponse:
+    """Test result and error framing of simple queries"""
+
+    def test_result_rows(self, connection, server):
+        """Test a result is sent as RowDescription, DataRows, CommandComplete and ReadyForQuery"""
+        server.semantic_parser.execute_query.return_value = {
+            'columns': [('region', 'text'), ('orders', 'integer')],
+            'data': [['emea', 3], [None, 4]]
+        }
+
+        asyncio.run(connection.handle_simple_query(_query("SELECT region, orders FROM fact")))
+
+        messages = _messages(connection.writer.data)
+        assert [msg_type for msg_type, _ in messages] == [b'T', b'D', b'D', b'C', b'Z']
+        assert messages[1][1] == b'\x00\x02' + b'\x00\x00\x00\x04emea' + b'\x00\x00\x00\x013'
+        assert messages[2][1] == b'\x00\x02' + b'\xff\xff\xff\xff' + b'\x00\x00\x00\x014'
+        assert messages[3][1] == b'SELECT 2\x00'
+
+    def test_unencodable_cell_sends_clean_error(self, connection, server):
+        """Test a row that fails to encode is dropped whole before the error response"""
+        server.semantic_parser.execute_query.return_value = {
+            'columns': [('name', 'text')],
+            'data': [['ok'], ['bad\ud800']]
+        }
+
+        asyncio.run(connection.handle_simple_query(_query("SELECT name FROM fact")))
+
+        messages = _messages(connection.writer.data)
+        assert [msg_type for msg_type, _ in messages] == [b'T', b'D', b'E', b'Z']
+        assert messages[1][1] == b'\x00\x01' + b'\x00\x00\x00\x02ok'
+        assert messages[3][1] == b'I'
+
+
+class TestResultCache:
+    """Test caching of translated query results"""
+
+    @pytest.fixture
+    def cached_server(self, server, tmp_path):
+        """Server with a real translator and an enabled result cache."""
+        (tmp_path / 'sales.yml').write_text(yaml.safe_dump(SALES_MODEL))
+        server.schema_manager = VirtualSchemaManager(str(tmp_path))
+        server.query_translator = SQLToSemanticTranslator(schema_manager=server.schema_manager)
+        server.result_cache = LineageCache(default_ttl_seconds=30, max_size=10, name='sql_result')
+        server.semantic_parser.execute_query.return_value = {
+            'columns': [('region', 'text')],
+            'data': [['emea']]
+        }
+        return server
+
+    def _run(self, connection, sql):
+        return asyncio.run(connection.execute_sql_query(sql))
+
+    def test_translator_shares_server_schema(self, tmp_path):
+        """Test the cache key's schema version comes from the schema the translator uses"""
+        schema_manager = VirtualSchemaManager(str(tmp_path))
+        with patch('app.sql_api.server.SemanticParser'), \
+             patch('app.sql_api.server.VirtualSchemaManager', return_value=schema_manager):
+            server = SQLServer(max_connections=1)
+
+        assert server.query_translator.schema_manager is server.schema_manager
+
+    def test_repeated_query_hits_cache(self, connection, cached_server):
+        """Test the same query, spelled differently, is executed once"""
+        first = self._run(connection, "SELECT region FROM sem_sales.fact")
+        second = self._run(connection, "select region from sem_sales.fact;")
+
+        assert second == first == {'columns': [('region', 'text')], 'rows': [['emea']]}
+        assert cached_server.semantic_parser.execute_query.await_count == 1
+
+    def test_other_user_misses_cache(self, connection, cached_server):
+        """Test results are not shared between users"""
+        self._run(connection, "SELECT region FROM sem_sales.fact")
+        connection.username = 'other'
+        self._run(connection, "SELECT region FROM sem_sales.fact")
+
+        assert cached_server.semantic_parser.execute_query.await_count == 2
+
+    def test_schema_reload_invalidates_cache(self, connection, cached_server):
+        """Test a model reload re-executes queries whose translation is unchanged"""
+        self._run(connection, "SELECT region FROM sem_sales.fact")
+        cached_server.schema_manager.reload_models()
+        self._run(connection, "SELECT region FROM sem_sales.fact")
+
+        assert cached_server.semantic_parser.execute_query.await_count == 2
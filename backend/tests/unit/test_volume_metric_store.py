@@ -0,0 +1,347 @@
+"""
+Unit tests for the Unity Catalog Volume metric store.
+Tests cover caching, ETag revalidation and cache statistics.
+"""
+
+import threading
+
+import pytest
+from unittest.mock import Mock, create_autospec, patch
+from datetime import datetime, timedelta
+
+import yaml
+from databricks.sdk.core import ApiClient
+
+from app.services import volume_metric_store
+from app.services.volume_metric_store import VolumeMetricStore, EnhancedMetricModel
+
+
+SAMPLE_METRIC = {
+    'name': 'revenue_metrics',
+    'description': 'Revenue metrics',
+    'model': 'main.gold.sales_fact',
+    'measures': [{'name': 'revenue', 'agg': 'sum', 'expr': 'order_amount'}],
+    'cache_config': {'ttl': '1h', 'refresh_frequency': '15m'}
+}
+
+
+class FakeVolume:
+    """In-memory volume answering Files API GETs, including If-None-Match."""
+
+    def __init__(self):
+        self.files = {
+            'revenue_metrics.yml': (yaml.safe_dump(SAMPLE_METRIC).encode('utf-8'), '"v1"')
+        }
+        self.downloads = 0
+        self.not_modified = 0
+
+    def do(self, method, path, query=None, headers=None, body=None, raw=False, files=None, data=None):
+        name = path.rsplit('/', 1)[1]
+        if name not in self.files:
+            raise Exception(f"{name} not found")
+
+        contents, etag = self.files[name]
+        response = Mock()
+        response._response.headers = {'ETag': etag}
+        if (headers or {}).get('If-None-Match') == etag:
+            self.not_modified += 1
+            response._response.status_code = 304
+            response.read.return_value = b''
+        else:
+            self.downloads += 1
+            response._response.status_code = 200
+            response.read.return_value = contents
+        return response
+
+
+@pytest.fixture
+def volume():
+    """Volume contents and request counters."""
+    return FakeVolume()
+
+
+@pytest.fixture
+def workspace_client(volume):
+    """Mock WorkspaceClient serving files from the fake volume."""
+    client = Mock()
+    client.api_client = create_autospec(ApiClient, instance=True)
+    client.api_client.do.side_effect = volume.do
+    return client
+
+
+@pytest.fixture
+def store(workspace_client):
+    """VolumeMetricStore wired to the mock WorkspaceClient."""
+    with patch('app.services.volume_metric_store.WorkspaceClient', return_value=workspace_client):
+        yield VolumeMetricStore()
+
+
+class TestVolumeStructure:
+    """Test volume directory verification on startup"""
+
+    def test_directories_checked_once_per_process(self, workspace_client):
+        """Test all category directories are checked, and only by the first store"""
+        volume_metric_store._verified_volume_roots.clear()
+
+        with patch('app.services.volume_metric_store.WorkspaceClient', return_value=workspace_client):
+            VolumeMetricStore()
+            VolumeMetricStore()
+
+        checked = sorted(
+            call[1]['directory_path'].rsplit('/', 1)[1]
+            for call in workspace_client.files.get_directory_metadata.call_args_list
+        )
+        assert checked == ['archives', 'production_models', 'staging_models', 'templates']
+
+
+class TestVolumeMetricStoreCaching:
+    """Test metric loading and in-memory caching"""
+
+    def test_get_metric_loads_from_volume(self, store, volume):
+        """Test a cold lookup downloads and parses the YAML file"""
+        metric = store.get_metric('revenue_metrics')
+
+        assert isinstance(metric, EnhancedMetricModel)
+        assert metric.name == 'revenue_metrics'
+        assert metric.cache_config.ttl == '1h'
+        assert volume.downloads == 1
+
+    def test_get_metric_cache_hit(self, store, workspace_client, volume):
+        """Test a warm lookup is served without touching the volume"""
+        store.get_metric('revenue_metrics')
+        workspace_client.api_client.do.reset_mock()
+
+        store.get_metric('revenue_metrics')
+
+        stats = store.get_usage_stats('revenue_metrics')
+        assert stats['usage_count'] == 2
+        assert isinstance(stats['last_accessed'], datetime)
+        assert volume.downloads == 1
+        workspace_client.api_client.do.assert_not_called()
+
+    def test_usage_stats_for_uncached_metric(self, store):
+        """Test usage stats default to zero for metrics never loaded"""
+        assert store.get_usage_stats('revenue_metrics') == {'usage_count': 0, 'last_accessed': None}
+
+    def test_missing_metric_returns_none(self, store):
+        """Test download failures are reported as a missing metric"""
+        assert store.get_metric('unknown') is None
+
+
+class TestVolumeMetricStoreETag:
+    """Test ETag revalidation of expired cache entries"""
+
+    def _expire(self, store, metric_id='revenue_metrics', category='production_models'):
+        cache_key = store._generate_cache_key(metric_id, category)
+        store._set_cache_timestamp(cache_key, datetime.now() - store.cache_ttl - timedelta(seconds=1))
+
+    def test_unchanged_etag_skips_download(self, store, workspace_client, volume):
+        """Test an expired entry with a matching ETag is revalidated in place"""
+        first = store.get_metric('revenue_metrics')
+        self._expire(store)
+
+        second = store.get_metric('revenue_metrics')
+
+        assert second is first
+        assert volume.downloads == 1
+        assert volume.not_modified == 1
+        call = workspace_client.api_client.do.call_args
+        assert call.args[0] == 'GET'
+        assert call.args[1].endswith('/production_models/revenue_metrics.yml')
+        assert call.kwargs['headers']['If-None-Match'] == '"v1"'
+
+    def test_changed_etag_downloads_again(self, store, volume):
+        """Test an expired entry with a new ETag is downloaded again"""
+        store.get_metric('revenue_metrics')
+        self._expire(store)
+        contents, _ = volume.files['revenue_metrics.yml']
+        volume.files['revenue_metrics.yml'] = (contents, '"v2"')
+
+        store.get_metric('revenue_metrics')
+
+        assert volume.downloads == 2
+        cache_key = store._generate_cache_key('revenue_metrics', 'production_models')
+        assert store.cache_etags[cache_key] == '"v2"'
+
+    def test_refresh_cache_revalidates_unchanged_files(self, store, workspace_client, volume):
+        """Test a full refresh does not re-download unchanged files"""
+        entry = Mock()
+        entry.name = 'revenue_metrics.yml'
+        workspace_client.files.list_directory_contents.return_value = [entry]
+        store.get_metric('revenue_metrics')
+
+        refreshed = store.refresh_cache_from_volume()
+
+        # One metric per category (production and staging) is listed;
+        # only the staging copy has never been downloaded before.
+        assert refreshed == 2
+        assert volume.downloads == 2
+        assert volume.not_modified == 1
+
+
+class TestVolumeMetricStoreStats:
+    """Test cache statistics bookkeeping"""
+
+    def test_empty_cache_stats(self, store):
+        """Test stats on an empty cache"""
+        stats = store.get_cache_stats()
+
+        assert stats['cached_metrics'] == 0
+        assert stats['oldest_cache_entry'] is None
+        assert stats['newest_cache_entry'] is None
+
+    def test_oldest_and_newest_track_updates(self, store):
+        """Test oldest/newest follow overwrites and deletions"""
+        base = datetime(2024, 1, 1)
+        store._set_cache_timestamp(('production_models', 'a'), base)
+        store._set_cache_timestamp(('production_models', 'b'), base + timedelta(minutes=1))
+        store._set_cache_timestamp(('production_models', 'c'), base + timedelta(minutes=2))
+
+        assert store._oldest_cache_timestamp() == base
+        assert store._newest_cache_timestamp() == base + timedelta(minutes=2)
+
+        # Refreshing the oldest entry moves it to the front
+        store._set_cache_timestamp(('production_models', 'a'), base + timedelta(minutes=3))
+        assert store._oldest_cache_timestamp() == base + timedelta(minutes=1)
+        assert store._newest_cache_timestamp() == base + timedelta(minutes=3)
+
+        # Dropping the newest entry falls back to the next newest
+        store._drop_cache_timestamp(('production_models', 'a'))
+        store._drop_cache_timestamp(('production_models', 'b'))
+        assert store._oldest_cache_timestamp() == base + timedelta(minutes=2)
+        assert store._newest_cache_timestamp() == base + timedelta(minutes=2)
+
+        # Expiring the newest entry in place lowers the newest timestamp
+        store._set_cache_timestamp(('production_models', 'd'), base + timedelta(minutes=5))
+        store._set_cache_timestamp(('production_models', 'd'), base)
+        assert store._oldest_cache_timestamp() == base
+        assert store._newest_cache_timestamp() == base + timedelta(minutes=2)
+
+    def test_cache_size_uses_serialized_bytes(self, store, volume):
+        """Test cache size is the YAML byte count of cached metrics"""
+        store.get_metric('revenue_metrics')
+        payload, _ = volume.files['revenue_metrics.yml']
+
+        assert store.get_cache_stats()['cache_size_mb'] == len(payload) / 1024 / 1024
+
+        store.delete_metric('revenue_metrics')
+        assert store.get_cache_stats()['cache_size_mb'] == 0
+
+
+class TestVolumeMetricStoreUploads:
+    """Test background uploads of saved metrics"""
+
+    def test_save_metric_uploads_in_background(self, store, workspace_client, volume):
+        """Test save updates the cache immediately and uploads on flush"""
+        metric = EnhancedMetricModel(**SAMPLE_METRIC)
+
+        assert store.save_metric(metric) is True
+        assert store.get_metric('revenue_metrics') is metric
+
+        store.flush()
+        upload = workspace_client.files.upload.call_args[1]
+        assert upload['file_path'].endswith('/production_models/revenue_metrics.yml')
+        assert yaml.safe_load(upload['contents'])['name'] == 'revenue_metrics'
+        assert volume.downloads == 0
+
+    def test_delete_waits_for_pending_upload(self, store, workspace_client):
+        """Test a delete is not overtaken by a queued upload of the same file"""
+        calls = []
+        workspace_client.files.upload.side_effect = lambda **kwargs: calls.append('upload')
+        workspace_client.files.delete.side_effect = lambda **kwargs: calls.append('delete')
+
+        store.save_metric(EnhancedMetricModel(**SAMPLE_METRIC))
+        store.delete_metric('revenue_metrics')
+
+        assert calls == ['upload', 'delete']
+
+    def test_failed_upload_is_reported_and_evicted(self, store, workspace_client, volume):
+        """Test flush reports a failed upload and reads fall back to the volume copy"""
+        workspace_client.files.upload.side_effect = Exception("volume unavailable")
+        metric = EnhancedMetricModel(**dict(SAMPLE_METRIC, description='Unsaved edit'))
+
+        assert store.save_metric(metric) is True
+        failed = store.flush()
+
+        assert len(failed) == 1
+        assert failed[0].endswith('/production_models/revenue_metrics.yml')
+        assert store.flush() == []
+        assert store.get_metric('revenue_metrics').description == 'Revenue metrics'
+        assert volume.downloads == 1
+
+    def test_flush_timeout(self, store, workspace_client):
+        """Test flush gives up after the timeout while an upload is still running"""
+        release = threading.Event()
+        workspace_client.files.upload.side_effect = lambda **kwargs: release.wait()
+
+        store.save_metric(EnhancedMetricModel(**SAMPLE_METRIC))
+        assert store.flush(timeout=0.05) == []
+        assert store._pending_uploads == 1
+
+        release.set()
+        assert store.flush(timeout=5) == []
+
+    def test_save_metric_as_json_round_trips(self, store, workspace_client, volume):
+        """Test JSON-formatted metric files are loaded back, and stay valid YAML"""
+        store.save_metric(EnhancedMetricModel(**SAMPLE_METRIC), as_json=True)
+        store.flush()
+        contents = workspace_client.files.upload.call_args[1]['contents']
+
+        assert contents.startswith(b'{')
+        assert yaml.safe_load(contents)['name'] == 'revenue_metrics'
+
+        volume.files['revenue_metrics.yml'] = (contents, '"v2"')
+        metric = store._load_metric_from_volume('revenue_metrics')
+        assert metric.name == 'revenue_metrics'
+        assert metric.cache_config.ttl == '1h'
+
+    def test_yaml_flow_mapping_falls_back_to_yaml(self, store, volume):
+        """Test a YAML file written as a flow mapping is not mistaken for JSON"""
+        volume.files['revenue_metrics.yml'] = (
+            b"{name: revenue_metrics, model: main.gold.sales_fact, cache_config: {ttl: 1h}}", '"v3"'
+        )
+
+        metric = store._load_metric_from_volume('revenue_metrics')
+        assert metric.name == 'revenue_metrics'
+        assert metric.cache_config.ttl == '1h'
+
+
+class TestVolumeMetricStoreBulkLoad:
+    """Test loading whole categories from a single listing"""
+
+    def _listing(self, *names):
+        entries = []
+        for name in names:
+            entry = Mock()
+            entry.name = name
+            entries.append(entry)
+        return entries
+
+    def test_metrics_with_cache_config(self, store, workspace_client, volume):
+        """Test only metrics with cache_config are returned, from one listing per category"""
+        plain_metric = dict(SAMPLE_METRIC, name='plain_metrics')
+        del plain_metric['cache_config']
+        volume.files['plain_metrics.yml'] = (yaml.safe_dump(plain_metric).encode('utf-8'), '"p1"')
+        workspace_client.files.list_directory_contents.side_effect = lambda directory_path: (
+            self._listing('revenue_metrics.yml', 'plain_metrics.yml', 'README.md')
+            if directory_path.endswith('production_models') else []
+        )
+
+        metrics = store.get_metrics_with_cache_config()
+
+        assert [metric.name for metric in metrics] == ['revenue_metrics']
+        assert workspace_client.files.list_directory_contents.call_count == 2
+        assert volume.downloads == 2
+        assert store.get_metric('plain_metrics').name == 'plain_metrics'
+        assert volume.downloads == 2
+
+    def test_bulk_load_reuses_valid_cache(self, store, workspace_client, volume):
+        """Test cached metrics are not downloaded again"""
+        workspace_client.files.list_directory_contents.return_value = self._listing('revenue_metrics.yml')
+        store.get_metric('revenue_metrics')
+
+        metrics = store._load_metrics_bulk('production_models')
+
+        assert [metric.name for metric in metrics] == ['revenue_metrics']
+        assert volume.downloads == 1
+